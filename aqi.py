@@ -0,0 +1,166 @@
+import bisect
+from array import array
+from itertools import accumulate, repeat
+from operator import eq, sub, truediv
+
+MOLAR_VOLUME = 24.45
+MOLECULAR_WEIGHTS = {
+    "carbon_monoxide": 28.01,
+    "nitrogen_dioxide": 46.01,
+    "sulphur_dioxide": 64.07,
+    "ozone": 48.00
+}
+POLLUTANT_LABELS = {
+    "pm2_5": "PM2.5",
+    "pm10": "PM10",
+    "ozone": "O3",
+    "nitrogen_dioxide": "NO2",
+    "sulphur_dioxide": "SO2",
+    "carbon_monoxide": "CO"
+}
+
+def _ppb_to_ugm3(field, edges, scale=1):
+    factor = MOLECULAR_WEIGHTS[field] / MOLAR_VOLUME * scale
+    return tuple(edge * factor for edge in edges)
+
+# Open-Meteo reports every pollutant in µg/m³, so the breakpoint tables are
+# converted once here instead of converting each hourly value.
+# Each entry is (averaging window in hours, concentration edges, index edges).
+US_AQI_TABLE = {
+    "pm2_5": (24, (0, 9.0, 35.4, 55.4, 125.4, 225.4, 325.4), (0, 50, 100, 150, 200, 300, 500)),
+    "pm10": (24, (0, 54, 154, 254, 354, 424, 604), (0, 50, 100, 150, 200, 300, 500)),
+    "ozone": (8, _ppb_to_ugm3("ozone", (0, 54, 70, 85, 105, 200)), (0, 50, 100, 150, 200, 300)),
+    "carbon_monoxide": (8, _ppb_to_ugm3("carbon_monoxide", (0, 4.4, 9.4, 12.4, 15.4, 30.4, 50.4), scale=1000), (0, 50, 100, 150, 200, 300, 500)),
+    "nitrogen_dioxide": (1, _ppb_to_ugm3("nitrogen_dioxide", (0, 53, 100, 360, 649, 1249, 2049)), (0, 50, 100, 150, 200, 300, 500)),
+    "sulphur_dioxide": (1, _ppb_to_ugm3("sulphur_dioxide", (0, 35, 75, 185, 304, 604, 1004)), (0, 50, 100, 150, 200, 300, 500))
+}
+EU_AQI_TABLE = {
+    "pm2_5": (24, (0, 10, 20, 25, 50, 75, 800), (0, 20, 40, 60, 80, 100, 120)),
+    "pm10": (24, (0, 20, 40, 50, 100, 150, 1200), (0, 20, 40, 60, 80, 100, 120)),
+    "nitrogen_dioxide": (1, (0, 40, 90, 120, 230, 340, 1000), (0, 20, 40, 60, 80, 100, 120)),
+    "ozone": (1, (0, 50, 100, 130, 240, 380, 800), (0, 20, 40, 60, 80, 100, 120)),
+    "sulphur_dioxide": (1, (0, 100, 200, 350, 500, 750, 1250), (0, 20, 40, 60, 80, 100, 120))
+}
+AQI_TABLES = {"us": US_AQI_TABLE, "eu": EU_AQI_TABLE}
+AQI_CATEGORIES = {
+    "us": (
+        (50, "Good", "#00E400"),
+        (100, "Moderate", "#FFFF00"),
+        (150, "Unhealthy for sensitive groups", "#FF7E00"),
+        (200, "Unhealthy", "#FF0000"),
+        (300, "Very unhealthy", "#8F3F97"),
+        (None, "Hazardous", "#7E0023")
+    ),
+    "eu": (
+        (20, "Good", "#50F0E6"),
+        (40, "Fair", "#50CCAA"),
+        (60, "Moderate", "#F0E641"),
+        (80, "Poor", "#FF5050"),
+        (100, "Very poor", "#960032"),
+        (None, "Extremely poor", "#7D2181")
+    )
+}
+# A rolling average needs at least three quarters of its hours (the EPA
+# 18-of-24 and 6-of-8 rules).
+MIN_COVERAGE = 0.75
+MISSING = -1.0
+
+def rolling_mean(values, window):
+    # Window sums are differences of prefix sums, so the work runs inside
+    # accumulate/map in C rather than in a Python loop over hours.
+    n = len(values)
+    lag = min(window, n + 1)
+    total = sum(values)
+    if total == total:
+        # No NaN gaps: only the leading hours can fall short of the coverage rule.
+        if window == 1:
+            return array('d', values)
+        sums = list(accumulate(values, initial=0.0))
+        window_counts = list(range(1, lag)) + [window] * (n - lag + 1)
+        means = array('d', map(truediv, map(sub, sums[1:], sums[:1] * (lag - 1) + sums[:n - lag + 1]), window_counts))
+        short = min(max(1, int(window * MIN_COVERAGE)) - 1, n)
+        means[:short] = array('d', repeat(MISSING, short))
+        return means
+    # max(0.0, nan) is 0.0, which zeroes gaps without a Python loop, and a
+    # second prefix sum over the non-NaN mask counts the hours each window has.
+    sums = list(accumulate(map(max, repeat(0.0, n), values), initial=0.0))
+    counts = list(accumulate(map(eq, values, values), initial=0))
+    window_sums = map(sub, sums[1:], sums[:1] * (lag - 1) + sums[:n - lag + 1])
+    window_counts = map(sub, counts[1:], counts[:1] * (lag - 1) + counts[:n - lag + 1])
+    min_count = max(1, int(window * MIN_COVERAGE))
+    return array('d', map(_window_mean, window_sums, window_counts, repeat(min_count, n)))
+
+def _window_mean(total, count, min_count):
+    return total / count if count >= min_count else MISSING
+
+def sub_index(concentration, edges, indexes):
+    if concentration is None or concentration < 0:
+        return None
+    i = bisect.bisect_left(edges, concentration)
+    if i == 0:
+        return indexes[0]
+    if i >= len(edges):
+        return indexes[-1]
+    c_lo, c_hi = edges[i - 1], edges[i]
+    i_lo, i_hi = indexes[i - 1], indexes[i]
+    return round(i_lo + (concentration - c_lo) * (i_hi - i_lo) / (c_hi - c_lo))
+
+def aqi_category(scheme, value):
+    if value is None:
+        return None, None
+    for upper, name, color in AQI_CATEGORIES[scheme]:
+        if upper is None or value <= upper:
+            return name, color
+
+def _day_bounds(times, dates):
+    # Hourly timestamps sort as strings, so each day is a bisected range.
+    bounds = []
+    for date in dates:
+        lo = bisect.bisect_left(times, date)
+        hi = bisect.bisect_left(times, date + "T99", lo)
+        bounds.append((lo, hi))
+    return bounds
+
+def compute_aqi(series, current_index, dates):
+    if series is None or not len(series):
+        return None
+    averaged = {}
+    for table in AQI_TABLES.values():
+        for field, (window, _, _) in table.items():
+            if field in series and (field, window) not in averaged:
+                averaged[field, window] = rolling_mean(series[field], window)
+    if not averaged:
+        return None
+    bounds = _day_bounds(series.times, dates)
+    result = {}
+    for scheme, table in AQI_TABLES.items():
+        components = {}
+        daily = [{"date": date, "index": None, "pollutant": None, "time": None} for date in dates]
+        for field, (window, edges, indexes) in table.items():
+            column = averaged.get((field, window))
+            if column is None:
+                continue
+            if current_index is not None:
+                value = sub_index(column[current_index], edges, indexes)
+                if value is not None:
+                    components[field] = value
+            # Sub-indices rise with concentration, so each day's worst hour for
+            # a pollutant is its highest averaged concentration.
+            for day, (lo, hi) in zip(daily, bounds):
+                if lo >= hi:
+                    continue
+                segment = column[lo:hi]
+                peak = max(segment)
+                value = sub_index(peak, edges, indexes)
+                if value is not None and (day["index"] is None or value > day["index"]):
+                    day["index"] = value
+                    day["pollutant"] = field
+                    day["time"] = series.times[lo + segment.index(peak)]
+        dominant = max(components, key=components.get) if components else None
+        result[scheme] = {
+            "current": components[dominant] if dominant else None,
+            "pollutant": dominant,
+            "components": components,
+            "daily": daily
+        }
+    return result
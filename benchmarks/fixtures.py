@@ -0,0 +1,165 @@
+import datetime
+import gzip
+import json
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_api import FORECAST_CURRENT_FIELDS, FORECAST_DAILY_FIELDS, AIR_QUALITY_HOURLY_FIELDS, AIR_QUALITY_PAST_DAYS
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FORECAST_HORIZONS = (2, 8, 17)
+AIR_QUALITY_DAYS = 5
+START = datetime.datetime(2024, 6, 1)
+
+def fixture_path(name):
+    return os.path.join(FIXTURE_DIR, f"{name}.json.gz")
+
+def save_fixture(name, data):
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    # A zero timestamp keeps re-recorded files byte-identical when the data is.
+    with open(fixture_path(name), "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+        f.write(json.dumps(data).encode("utf-8"))
+
+def load_fixture(name):
+    # Recorded fixtures win; otherwise a deterministic synthetic response with
+    # the same shape is generated so the suite runs on machines without network.
+    try:
+        with gzip.open(fixture_path(name), "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except OSError:
+        pass
+    if name == "geocoding":
+        return synthetic_geocoding()
+    if name == "air_quality":
+        return synthetic_air_quality()
+    if name.startswith("forecast_") and name.endswith("d"):
+        return synthetic_forecast(int(name[len("forecast_"):-1]))
+    raise KeyError(name)
+
+def _hours(days, past_days=0):
+    first = START - datetime.timedelta(days=past_days)
+    return [(first + datetime.timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M") for i in range((past_days + days) * 24)]
+
+def _series(rng, count, base, amplitude, noise, low=None, high=None, digits=1):
+    values = []
+    for i in range(count):
+        value = base + amplitude * math.sin((i % 24) / 24 * 2 * math.pi - math.pi / 2) + rng.uniform(-noise, noise)
+        if low is not None:
+            value = max(low, value)
+        if high is not None:
+            value = min(high, value)
+        values.append(round(value, digits))
+    return values
+
+def synthetic_geocoding(name="Nairobi"):
+    return {"results": [{
+        "id": 184745, "name": name, "latitude": -1.28333, "longitude": 36.81667,
+        "elevation": 1661.0, "timezone": "Africa/Nairobi", "country": "Kenya", "admin1": "Nairobi Area"
+    }], "generationtime_ms": 0.5}
+
+def synthetic_forecast(days, seed=1):
+    rng = random.Random(seed * 1000 + days)
+    hours = _hours(days)
+    n = len(hours)
+    codes = [0, 1, 2, 3, 45, 51, 61, 63, 80, 95]
+    hourly = {
+        "time": hours,
+        "temperature_2m": _series(rng, n, 20, 6, 1),
+        "apparent_temperature": _series(rng, n, 21, 7, 1),
+        "precipitation_probability": _series(rng, n, 30, 25, 15, 0, 100, 0),
+        "precipitation": _series(rng, n, 0.2, 0.4, 0.3, 0),
+        "rain": _series(rng, n, 0.2, 0.4, 0.3, 0),
+        "showers": _series(rng, n, 0.1, 0.2, 0.2, 0),
+        "snowfall": [0.0] * n,
+        "weather_code": [rng.choice(codes) for _ in range(n)],
+        "cloud_cover": _series(rng, n, 50, 30, 20, 0, 100, 0),
+        "wind_speed_10m": _series(rng, n, 12, 5, 3, 0),
+        "wind_direction_10m": [rng.randint(0, 359) for _ in range(n)],
+        "wind_gusts_10m": _series(rng, n, 22, 8, 5, 0),
+        "uv_index": _series(rng, n, 4, 5, 0.5, 0, 12, 2)
+    }
+    dates = [(START + datetime.timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+    daily = {"time": dates}
+    for field in FORECAST_DAILY_FIELDS.split(","):
+        if field == "sunrise":
+            daily[field] = [f"{d}T06:3{i % 10}" for i, d in enumerate(dates)]
+        elif field == "sunset":
+            daily[field] = [f"{d}T18:4{i % 10}" for i, d in enumerate(dates)]
+        elif field == "weather_code":
+            daily[field] = [rng.choice(codes) for _ in dates]
+        else:
+            daily[field] = [round(rng.uniform(0, 30), 1) for _ in dates]
+    current = {"time": hours[12][:14] + "15", "interval": 900}
+    for field in FORECAST_CURRENT_FIELDS.split(","):
+        current[field] = 1 if field == "is_day" else (2 if field == "weather_code" else round(rng.uniform(0, 30), 1))
+    return {
+        "latitude": -1.25, "longitude": 36.875, "generationtime_ms": 0.9, "utc_offset_seconds": 10800,
+        "timezone": "Africa/Nairobi", "timezone_abbreviation": "EAT", "elevation": 1661.0,
+        "current_units": {"time": "iso8601", "interval": "seconds"},
+        "current": current,
+        "hourly_units": {"time": "iso8601"},
+        "hourly": hourly,
+        "daily_units": {"time": "iso8601"},
+        "daily": daily
+    }
+
+def synthetic_air_quality(days=AIR_QUALITY_DAYS, seed=2):
+    rng = random.Random(seed)
+    hours = _hours(days, AIR_QUALITY_PAST_DAYS)
+    n = len(hours)
+    bases = {"pm10": 30, "pm2_5": 15, "carbon_monoxide": 300, "nitrogen_dioxide": 20, "sulphur_dioxide": 5, "ozone": 60}
+    hourly = {"time": hours}
+    for field in AIR_QUALITY_HOURLY_FIELDS.split(","):
+        hourly[field] = _series(rng, n, bases[field], bases[field] * 0.4, bases[field] * 0.2, 0)
+    return {
+        "latitude": -1.3, "longitude": 36.8, "utc_offset_seconds": 10800, "timezone": "Africa/Nairobi",
+        "hourly_units": {"time": "iso8601"}, "hourly": hourly
+    }
+
+def synthetic_history(start_date, end_date, seed=3):
+    first = datetime.datetime.combine(start_date, datetime.time())
+    count = ((end_date - start_date).days + 1) * 24
+    rng = random.Random(seed * 100000 + start_date.toordinal())
+    hourly = {"time": [(first + datetime.timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M") for i in range(count)]}
+    hourly.update({
+        "temperature_2m": _series(rng, count, 19, 6, 2),
+        "apparent_temperature": _series(rng, count, 20, 7, 2),
+        "relative_humidity_2m": _series(rng, count, 65, 15, 10, 0, 100, 0),
+        "precipitation": _series(rng, count, 0.1, 0.4, 0.4, 0),
+        "rain": _series(rng, count, 0.1, 0.4, 0.4, 0),
+        "snowfall": [0.0] * count,
+        "cloud_cover": _series(rng, count, 50, 30, 20, 0, 100, 0),
+        "wind_speed_10m": _series(rng, count, 12, 5, 3, 0)
+    })
+    return {"latitude": -1.25, "longitude": 36.875, "timezone": "Africa/Nairobi", "hourly_units": {"time": "iso8601"}, "hourly": hourly}
+
+def record(city="Nairobi"):
+    import weather_api
+    geocoding = weather_api._get_json(weather_api.GEOCODING_URL, {"name": city, "count": 1, "language": "en", "format": "json"})
+    save_fixture("geocoding", geocoding)
+    result = geocoding["results"][0]
+    lat, lon = result["latitude"], result["longitude"]
+    for forecast_days in FORECAST_HORIZONS:
+        save_fixture(f"forecast_{forecast_days}d", weather_api._get_json(
+            weather_api.OPEN_METEO_BASE_URL, weather_api._forecast_params(lat, lon, "auto", forecast_days - 1)))
+    save_fixture("air_quality", weather_api._get_json(
+        weather_api.OPEN_METEO_AIR_QUALITY_URL, weather_api._air_quality_params(lat, lon, "auto")))
+
+def write_synthetic():
+    # Writes the generated responses as fixture files, for machines that
+    # cannot reach Open-Meteo but should still share one committed set.
+    save_fixture("geocoding", synthetic_geocoding())
+    for forecast_days in FORECAST_HORIZONS:
+        save_fixture(f"forecast_{forecast_days}d", synthetic_forecast(forecast_days))
+    save_fixture("air_quality", synthetic_air_quality())
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--synthetic"]:
+        write_synthetic()
+    else:
+        record(sys.argv[1] if len(sys.argv) > 1 else "Nairobi")
+    print(f"Recorded fixtures into {FIXTURE_DIR}")
@@ -0,0 +1,361 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+_cache_root = tempfile.mkdtemp(prefix="weather-bench-")
+os.environ["WEATHER_APP_CACHE_DIR"] = os.path.join(_cache_root, "default")
+
+import aqi
+import geocache
+import history
+import response_cache
+import snapshots
+import streaming
+import weather_api
+from baseline_parser import parse_weather_data as baseline_parse_weather_data
+from fixtures import load_fixture
+from stub_server import StubServer
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+NOISE_FLOOR = 1.0
+# Only medians and peak memory are gated; a p95 over 20 samples is one outlier.
+GATED_METRICS = ("p50_ms", "peak_kb")
+# Measurements of code the app no longer runs, kept for comparison only.
+REFERENCE_RESULTS = ("fetch_sequential", "parse_16d.json", "parser_16d.forecast.baseline", "parser_16d.with_air_quality.baseline")
+
+UI_STARTUP_SCRIPT = """
+import main
+app = main.WeatherApp()
+ui = app.weather_ui
+def check():
+    if ui.render_times:
+        print("rendered", flush=True)
+        app.destroy()
+    else:
+        app.after(5, check)
+app.after(0, check)
+app.mainloop()
+"""
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+def summarize(samples_seconds):
+    samples = [s * 1000 for s in samples_seconds]
+    return {"p50_ms": statistics.median(samples), "p95_ms": percentile(samples, 0.95), "n": len(samples)}
+
+def rounded(results):
+    if isinstance(results, dict):
+        return {key: rounded(value) for key, value in results.items()}
+    return round(results, 3) if isinstance(results, float) else results
+
+def fresh_caches():
+    cache_dir = tempfile.mkdtemp(dir=_cache_root)
+    os.environ["WEATHER_APP_CACHE_DIR"] = cache_dir
+    geocache._default_cache = None
+    response_cache._default_cache = None
+    snapshots._default_store = None
+    history._default_store = None
+    return cache_dir
+
+def point_at(stub):
+    weather_api.GEOCODING_URL = stub.urls["WEATHER_APP_GEOCODING_URL"]
+    weather_api.OPEN_METEO_BASE_URL = stub.urls["WEATHER_APP_FORECAST_URL"]
+    weather_api.OPEN_METEO_AIR_QUALITY_URL = stub.urls["WEATHER_APP_AIR_QUALITY_URL"]
+    weather_api.OPEN_METEO_ARCHIVE_URL = stub.urls["WEATHER_APP_ARCHIVE_URL"]
+
+def search_to_render(city="Nairobi"):
+    lat, lon, _ = weather_api.get_coordinates(city)
+    weather_data, air_quality_data = weather_api.get_weather_data(lat, lon)
+    return weather_api.parse_weather_data(weather_data, air_quality_data)
+
+def bench_search_cold(stub, iterations):
+    samples = []
+    for _ in range(iterations):
+        fresh_caches()
+        start = time.perf_counter()
+        search_to_render()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def bench_search_warm(stub, iterations):
+    fresh_caches()
+    search_to_render()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        search_to_render()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def bench_fetch_sequential(stub, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        weather_api._get_json(weather_api.OPEN_METEO_BASE_URL, weather_api._forecast_params(1.0, 2.0, "auto", 7))
+        weather_api._get_json(weather_api.OPEN_METEO_AIR_QUALITY_URL, weather_api._air_quality_params(1.0, 2.0, "auto"))
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def bench_fetch_parallel(stub, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        weather_api.get_weather_data(1.0, 2.0, use_cache=False)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def bench_unit_toggle(stub, iterations):
+    fresh_caches()
+    parsed_data = search_to_render()
+    requests_before = stub.request_count
+    samples = []
+    for i in range(iterations * 10):
+        start = time.perf_counter()
+        weather_api.convert_parsed_data(parsed_data, "fahrenheit" if i % 2 == 0 else "celsius")
+        samples.append(time.perf_counter() - start)
+    result = summarize(samples)
+    result["http_requests"] = stub.request_count - requests_before
+    if result["http_requests"]:
+        raise AssertionError(f"unit toggle made {result['http_requests']} HTTP requests")
+    return result
+
+def bench_batch(stub, iterations, locations=20):
+    coordinates = [(i * 0.5, i * 0.25) for i in range(locations)]
+    samples = []
+    for _ in range(iterations):
+        requests_before = stub.request_count
+        start = time.perf_counter()
+        for _ in weather_api.get_weather_data_batch(coordinates, use_cache=False):
+            pass
+        samples.append(time.perf_counter() - start)
+    result = summarize(samples)
+    result["http_requests"] = stub.request_count - requests_before
+    return result
+
+def _forecast_text(days):
+    return json.dumps(load_fixture(f"forecast_{days}d"))
+
+def bench_parse(stub, iterations, days=17):
+    text = _forecast_text(days)
+    air_quality = load_fixture("air_quality")
+    hourly_fields = set(weather_api.FORECAST_HOURLY_FIELDS.split(","))
+    chunks = [text[i:i + streaming.STREAM_CHUNK_SIZE] for i in range(0, len(text), streaming.STREAM_CHUNK_SIZE)]
+    results = {}
+    for name, decode in (
+        ("json", lambda: json.loads(text)),
+        ("streaming", lambda: streaming.decode_forecast_stream(chunks, hourly_fields))
+    ):
+        samples = []
+        for _ in range(iterations * 10):
+            start = time.perf_counter()
+            parsed = weather_api.parse_weather_data(decode(), air_quality)
+            parsed["hourly"]["temperature_2m"]
+            samples.append(time.perf_counter() - start)
+        tracemalloc.start()
+        weather_api.parse_weather_data(decode(), air_quality)["hourly"]["temperature_2m"]
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        result = summarize(samples)
+        result["peak_kb"] = peak / 1024
+        results[name] = result
+    return results
+
+def bench_parser(stub, iterations, days=17):
+    # Both parsers get the same json.loads output, so only parsing is timed.
+    # With air quality the current parser also derives the US and EU AQI,
+    # which the baseline never did, so the forecast alone is timed as well.
+    weather_data = json.loads(_forecast_text(days))
+    air_quality = load_fixture("air_quality")
+    results = {}
+    for case, case_air_quality in (("forecast", None), ("with_air_quality", air_quality)):
+        results[case] = {}
+        for name, parse in (("baseline", baseline_parse_weather_data), ("current", weather_api.parse_weather_data)):
+            samples = []
+            for _ in range(iterations * 10):
+                start = time.perf_counter()
+                parse(weather_data, case_air_quality)
+                samples.append(time.perf_counter() - start)
+            tracemalloc.start()
+            parsed = parse(weather_data, case_air_quality)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            del parsed
+            result = summarize(samples)
+            result["peak_kb"] = peak / 1024
+            results[case][name] = result
+    return results
+
+def bench_aqi(stub, iterations):
+    air_quality = load_fixture("air_quality")
+    dates = load_fixture("forecast_8d")["daily"]["time"]
+    series = weather_api.TimeSeries(air_quality["hourly"])
+    current_index = series.nearest_index(dates[0] + "T12:00")
+    samples = []
+    for _ in range(iterations * 10):
+        start = time.perf_counter()
+        aqi.compute_aqi(series, current_index, dates)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def bench_history(stub, iterations, days=weather_api.HISTORY_DAYS):
+    results = {}
+    samples = []
+    for _ in range(max(3, iterations // 4)):
+        fresh_caches()
+        start = time.perf_counter()
+        weather_api.get_history(1.0, 2.0, days=days)
+        samples.append(time.perf_counter() - start)
+    results["cold"] = summarize(samples)
+    requests_before = stub.request_count
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        weather_api.get_history(1.0, 2.0, days=days)
+        samples.append(time.perf_counter() - start)
+    results["warm"] = summarize(samples)
+    results["warm"]["http_requests"] = stub.request_count - requests_before
+    return results
+
+def _run_subprocess(args, env, until=None):
+    start = time.perf_counter()
+    process = subprocess.Popen(args, cwd=REPO_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    if until is not None:
+        for line in process.stdout:
+            if until in line:
+                break
+        elapsed = time.perf_counter() - start
+        process.wait(timeout=30)
+    else:
+        process.communicate(timeout=60)
+        elapsed = time.perf_counter() - start
+    if process.returncode:
+        raise RuntimeError(f"{' '.join(args)} exited with {process.returncode}")
+    return elapsed
+
+def bench_cli_cold_start(stub, iterations):
+    samples = []
+    for _ in range(max(3, iterations // 4)):
+        env = dict(os.environ, WEATHER_APP_CACHE_DIR=fresh_caches(), **stub.urls)
+        samples.append(_run_subprocess([sys.executable, "cli.py", "fetch", "--city", "Nairobi", "--json"], env))
+    return summarize(samples)
+
+def bench_ui_startup(stub, iterations):
+    if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+        return None
+    results = {}
+    cache_dir = fresh_caches()
+    env = dict(os.environ, WEATHER_APP_CACHE_DIR=cache_dir, **stub.urls)
+    samples = []
+    for _ in range(max(3, iterations // 4)):
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.makedirs(cache_dir)
+        samples.append(_run_subprocess([sys.executable, "-c", UI_STARTUP_SCRIPT], env, until="rendered"))
+    results["no_snapshot"] = summarize(samples)
+    samples = []
+    for _ in range(max(3, iterations // 4)):
+        samples.append(_run_subprocess([sys.executable, "-c", UI_STARTUP_SCRIPT], env, until="rendered"))
+    results["with_snapshot"] = summarize(samples)
+    return results
+
+SCENARIOS = {
+    "cli_cold_start": bench_cli_cold_start,
+    "ui_startup": bench_ui_startup,
+    "search_cold": bench_search_cold,
+    "search_warm": bench_search_warm,
+    "fetch_sequential": bench_fetch_sequential,
+    "fetch_parallel": bench_fetch_parallel,
+    "unit_toggle": bench_unit_toggle,
+    "batch_20": bench_batch,
+    "parse_16d": bench_parse,
+    "parser_16d": bench_parser,
+    "aqi": bench_aqi,
+    "history_30d": bench_history
+}
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not key == "n":
+            flat[name] = value
+    return flat
+
+def compare(results, baseline, threshold):
+    regressions = []
+    current = flatten(results)
+    for name, old in flatten(baseline).items():
+        new = current.get(name)
+        if new is None or not old or not name.endswith(GATED_METRICS):
+            continue
+        if any(name == reference or name.startswith(reference + ".") for reference in REFERENCE_RESULTS):
+            continue
+        # Sub-millisecond timings are dominated by noise; allow an absolute floor.
+        if new > old * (1 + threshold) and new - old > NOISE_FLOOR:
+            regressions.append(f"{name}: {old:.3f} -> {new:.3f} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded Open-Meteo responses and benchmark the app.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub server latency in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Uniform latency jitter in seconds.")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="*", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before failing, e.g. 0.25 for 25%%.")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    stub = StubServer(latency=args.latency, jitter=args.jitter).start()
+    point_at(stub)
+    results = {}
+    try:
+        for name in args.scenarios:
+            result = SCENARIOS[name](stub, args.iterations)
+            if result is None:
+                print(f"{name:18} skipped")
+                continue
+            results[name] = result
+            print(f"{name:18} {json.dumps(rounded(result))}")
+    finally:
+        stub.stop()
+        shutil.rmtree(_cache_root, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rounded(results), f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(rounded(results), f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("Regressions beyond threshold:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions beyond threshold.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import datetime
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from fixtures import load_fixture, synthetic_forecast, synthetic_history
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency=0.05, jitter=0.01, port=0, seed=0):
+        super().__init__(("127.0.0.1", port), StubRequestHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.request_count = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._bodies = {}
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def urls(self):
+        return {
+            "WEATHER_APP_GEOCODING_URL": f"{self.base_url}/v1/search",
+            "WEATHER_APP_FORECAST_URL": f"{self.base_url}/v1/forecast",
+            "WEATHER_APP_AIR_QUALITY_URL": f"{self.base_url}/v1/air-quality",
+            "WEATHER_APP_ARCHIVE_URL": f"{self.base_url}/v1/archive"
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def delay(self):
+        with self._lock:
+            self.request_count += 1
+            return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def body_for(self, path, query):
+        if "start_date" in query:
+            # Date-range requests are history fetches; they are generated per
+            # range so incremental fetches get exactly the days they ask for.
+            start_date = datetime.date.fromisoformat(query["start_date"][0])
+            end_date = datetime.date.fromisoformat(query["end_date"][0])
+            return json.dumps(synthetic_history(start_date, end_date)).encode("utf-8")
+        if path.endswith("/search"):
+            name = "geocoding"
+        elif path.endswith("/air-quality"):
+            name = "air_quality"
+        else:
+            name = f"forecast_{query.get('forecast_days', ['8'])[0]}d"
+        lats = query.get("latitude", ["0"])[0].split(",")
+        key = (name, len(lats))
+        with self._lock:
+            body = self._bodies.get(key)
+        if body is None:
+            try:
+                data = load_fixture(name)
+            except KeyError:
+                data = synthetic_forecast(int(query["forecast_days"][0]))
+            if len(lats) > 1:
+                data = [data] * len(lats)
+            body = json.dumps(data).encode("utf-8")
+            with self._lock:
+                self._bodies[key] = body
+        return body
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, the body
+    # waits for the client's delayed ACK and adds ~40 ms to every request.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        time.sleep(self.server.delay())
+        body = self.server.body_for(url.path, parse_qs(url.query))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
@@ -0,0 +1,267 @@
+import argparse
+import datetime
+import json
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from weather_api import get_coordinates, get_weather_data, is_weather_data_fresh, parse_weather_data, convert_parsed_data, convert_temperature, get_history
+from response_cache import make_cache_key, next_refresh_time
+from timeseries import TimeSeries
+from aqi import aqi_category, POLLUTANT_LABELS
+import metrics
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, TimeSeries):
+        columns = {"time": value.times}
+        for field in value.fields():
+            columns[field] = [value.value_at(field, i) for i in range(len(value))]
+        return columns
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def serialize_parsed_data(parsed_data, include_hourly=False):
+    if not include_hourly:
+        parsed_data = {k: v for k, v in parsed_data.items() if not isinstance(v, TimeSeries)}
+    return json.dumps(parsed_data, default=_json_default, separators=(",", ":"))
+
+def fetch_forecast(city=None, lat=None, lon=None, timezone="auto", days=7, display_location=None):
+    if lat is None or lon is None:
+        lat, lon, display_location = get_coordinates(city)
+        if lat is None or lon is None:
+            return None, None
+    # A one-shot fetch or a served body cannot pick up a background
+    # revalidation, so a stale cache entry is refetched instead of returned.
+    force = not is_weather_data_fresh(lat, lon, timezone, days)
+    weather_data, air_quality_data = get_weather_data(lat, lon, timezone=timezone, daily_forecast_days=days, force=force)
+    if not weather_data:
+        return None, display_location
+    parsed_data = parse_weather_data(weather_data, air_quality_data)
+    parsed_data["location"] = display_location or f"{lat},{lon}"
+    return parsed_data, display_location
+
+def format_text(parsed_data, unit):
+    unit_symbol = "°C" if unit == "celsius" else "°F"
+    current = parsed_data['current']
+    lines = [
+        parsed_data['location'],
+        f"{current['temp']:.0f}{unit_symbol}  {current['description']}" if current['temp'] is not None else current['description']
+    ]
+    aqi = parsed_data.get('aqi')
+    if aqi:
+        parts = []
+        for scheme in ("us", "eu"):
+            value = aqi[scheme]['current']
+            if value is not None:
+                parts.append(f"{scheme.upper()} AQI {value} ({aqi_category(scheme, value)[0]}, {POLLUTANT_LABELS[aqi[scheme]['pollutant']]})")
+        if parts:
+            lines.append("  ".join(parts))
+    daily_aqi = aqi['us']['daily'] if aqi else []
+    for i, day in enumerate(parsed_data['daily']):
+        temp_max = f"{day['temp_max']:.0f}" if day['temp_max'] is not None else "--"
+        temp_min = f"{day['temp_min']:.0f}" if day['temp_min'] is not None else "--"
+        line = f"{day['dt'].strftime('%a %d %b')}  {temp_max}{unit_symbol}/{temp_min}{unit_symbol}  {day['description']}"
+        if i < len(daily_aqi) and daily_aqi[i]['index'] is not None:
+            line += f"  AQI {daily_aqi[i]['index']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+def run_fetch(args):
+    if args.metrics_jsonl:
+        metrics.enable(jsonl_path=args.metrics_jsonl)
+    parsed_data, _ = fetch_forecast(args.city, args.lat, args.lon, args.timezone, args.days)
+    if parsed_data is None:
+        print("Could not fetch weather data.", file=sys.stderr)
+        return 1
+    parsed_data = convert_parsed_data(parsed_data, args.unit)
+    if args.json:
+        print(serialize_parsed_data(parsed_data, include_hourly=args.hourly))
+    else:
+        print(format_text(parsed_data, args.unit))
+    return 0
+
+def run_history(args):
+    lat, lon = args.lat, args.lon
+    if lat is None or lon is None:
+        lat, lon, _ = get_coordinates(args.city)
+        if lat is None or lon is None:
+            print("Could not find location.", file=sys.stderr)
+            return 1
+    summary = get_history(lat, lon, timezone=args.timezone, days=args.days)
+    if summary is None:
+        print("History store unavailable.", file=sys.stderr)
+        return 1
+    unit_symbol = "°C" if args.unit == "celsius" else "°F"
+    rows = []
+    for i, date in enumerate(summary.times):
+        rows.append({
+            "date": date,
+            "temp_min": convert_temperature(summary.value_at('temp_min', i), args.unit),
+            "temp_max": convert_temperature(summary.value_at('temp_max', i), args.unit),
+            "precipitation": summary.value_at('precipitation', i),
+            "precipitation_rolling": summary.value_at('precipitation_rolling', i)
+        })
+    if args.json:
+        print(json.dumps(rows, separators=(",", ":")))
+        return 0
+    for row in rows:
+        temp_max = f"{row['temp_max']:.0f}" if row['temp_max'] is not None else "--"
+        temp_min = f"{row['temp_min']:.0f}" if row['temp_min'] is not None else "--"
+        precipitation = f"{row['precipitation']:.1f}" if row['precipitation'] is not None else "--"
+        print(f"{row['date']}  {temp_max}{unit_symbol}/{temp_min}{unit_symbol}  {precipitation} mm  (7-day {row['precipitation_rolling'] or 0:.1f} mm)")
+    return 0
+
+class ForecastServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, timezone="auto", days=7):
+        super().__init__(address, ForecastRequestHandler)
+        self.timezone = timezone
+        self.days = days
+        self._responses = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def get_forecast_body(self, city, lat, lon, unit, include_hourly):
+        display_location = None
+        if lat is None or lon is None:
+            lat, lon, display_location = get_coordinates(city)
+            if lat is None or lon is None:
+                return None
+        key = (make_cache_key(lat, lon, self.timezone, self.days), display_location, unit, include_hourly)
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None and time.time() < cached[0]:
+                return cached[1]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Concurrent requests for the same forecast wait for a single fetch.
+        try:
+            with key_lock:
+                with self._lock:
+                    cached = self._responses.get(key)
+                    if cached is not None and time.time() < cached[0]:
+                        return cached[1]
+                parsed_data, _ = fetch_forecast(city, lat, lon, self.timezone, self.days, display_location)
+                if parsed_data is None:
+                    return None
+                parsed_data = convert_parsed_data(parsed_data, unit)
+                body = serialize_parsed_data(parsed_data, include_hourly=include_hourly).encode("utf-8")
+                now = time.time()
+                with self._lock:
+                    for expired in [k for k, (expires_at, _) in self._responses.items() if expires_at <= now]:
+                        del self._responses[expired]
+                    self._responses[key] = (next_refresh_time(now), body)
+                return body
+        finally:
+            # The body is cached before the lock is dropped, so later requests
+            # are served from _responses instead of creating a new lock.
+            with self._lock:
+                if self._key_locks.get(key) is key_lock:
+                    del self._key_locks[key]
+
+class ForecastRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send(200, b'{"status":"ok"}')
+            return
+        if url.path == "/metrics":
+            self._send(200, metrics.export_prometheus().encode("utf-8"), content_type="text/plain; version=0.0.4")
+            return
+        if url.path != "/forecast":
+            self._send(404, b'{"error":"not found"}')
+            return
+        query = parse_qs(url.query)
+        city = query.get("city", [None])[0]
+        unit = query.get("unit", ["celsius"])[0]
+        include_hourly = query.get("hourly", ["0"])[0] in ("1", "true")
+        try:
+            lat = float(query["lat"][0]) if "lat" in query else None
+            lon = float(query["lon"][0]) if "lon" in query else None
+        except ValueError:
+            self._send(400, b'{"error":"invalid coordinates"}')
+            return
+        if unit not in ("celsius", "fahrenheit") or (city is None and (lat is None or lon is None)):
+            self._send(400, b'{"error":"expected city or lat/lon, and unit celsius or fahrenheit"}')
+            return
+        metrics.incr("serve_requests")
+        try:
+            body = self.server.get_forecast_body(city, lat, lon, unit, include_hourly)
+        except Exception as e:
+            self._send(500, json.dumps({"error": str(e)}).encode("utf-8"))
+            return
+        if body is None:
+            self._send(502, b'{"error":"could not fetch weather data"}')
+            return
+        self._send(200, body)
+
+    def _send(self, status, body, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def run_serve(args):
+    metrics.enable(jsonl_path=args.metrics_jsonl)
+    server = ForecastServer((args.host, args.port), timezone=args.timezone, days=args.days)
+    print(f"Serving forecasts on http://{args.host}:{server.server_address[1]}/forecast")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless weather client for Open-Meteo.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fetch_parser = subparsers.add_parser("fetch", help="Fetch and print a forecast.")
+    location = fetch_parser.add_mutually_exclusive_group(required=True)
+    location.add_argument("--city")
+    location.add_argument("--coords", nargs=2, type=float, metavar=("LAT", "LON"))
+    fetch_parser.add_argument("--unit", choices=("celsius", "fahrenheit"), default="celsius")
+    fetch_parser.add_argument("--timezone", default="auto")
+    fetch_parser.add_argument("--days", type=int, default=7)
+    fetch_parser.add_argument("--json", action="store_true", help="Print the parsed forecast as JSON.")
+    fetch_parser.add_argument("--hourly", action="store_true", help="Include hourly series in JSON output.")
+    fetch_parser.add_argument("--metrics-jsonl", help="Append timing spans as JSON lines to this file.")
+    fetch_parser.set_defaults(func=run_fetch)
+
+    history_parser = subparsers.add_parser("history", help="Print daily history from the local store, fetching missing days.")
+    location = history_parser.add_mutually_exclusive_group(required=True)
+    location.add_argument("--city")
+    location.add_argument("--coords", nargs=2, type=float, metavar=("LAT", "LON"))
+    history_parser.add_argument("--unit", choices=("celsius", "fahrenheit"), default="celsius")
+    history_parser.add_argument("--timezone", default="auto")
+    history_parser.add_argument("--days", type=int, default=30)
+    history_parser.add_argument("--json", action="store_true", help="Print the daily rows as JSON.")
+    history_parser.set_defaults(func=run_history)
+
+    serve_parser = subparsers.add_parser("serve", help="Serve cached parsed forecasts over HTTP.")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--timezone", default="auto")
+    serve_parser.add_argument("--days", type=int, default=7)
+    serve_parser.add_argument("--metrics-jsonl", help="Append timing spans as JSON lines to this file.")
+    serve_parser.set_defaults(func=run_serve)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command in ("fetch", "history"):
+        args.lat, args.lon = args.coords if args.coords else (None, None)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import bisect
+import csv
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from storage import get_cache_path
+
+GEOCACHE_FILENAME = "geocache.sqlite3"
+GEOCACHE_TTL_SECONDS = 30 * 24 * 3600
+GEOCACHE_MAX_ENTRIES = 20000
+
+def normalize_city_name(city_name):
+    return " ".join(city_name.casefold().split())
+
+class GeocodingCache:
+    def __init__(self, path=None, ttl=GEOCACHE_TTL_SECONDS, max_entries=GEOCACHE_MAX_ENTRIES):
+        self.path = path or get_cache_path(GEOCACHE_FILENAME)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._prefix_index = []
+        self._touched = set()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS places ("
+            "key TEXT PRIMARY KEY, display_name TEXT NOT NULL, "
+            "latitude REAL NOT NULL, longitude REAL NOT NULL, "
+            "fetched_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._load()
+
+    def _load(self):
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            self._conn.execute("DELETE FROM places WHERE fetched_at < ?", (cutoff,))
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT key, display_name, latitude, longitude, fetched_at FROM places ORDER BY last_used"
+            ).fetchall()
+            for key, display_name, lat, lon, fetched_at in rows:
+                self._entries[key] = (lat, lon, display_name, fetched_at)
+            self._prefix_index = sorted((key, self._entries[key][2]) for key in self._entries)
+
+    def get(self, city_name):
+        key = normalize_city_name(city_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            lat, lon, display_name, fetched_at = entry
+            if time.time() - fetched_at > self.ttl:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._touched.add(key)
+            self.hits += 1
+            return lat, lon, display_name
+
+    def put(self, city_name, lat, lon, display_name, fetched_at=None):
+        self.put_many([(city_name, lat, lon, display_name)], fetched_at=fetched_at)
+
+    def put_many(self, places, fetched_at=None):
+        now = time.time()
+        fetched_at = fetched_at or now
+        rows = []
+        with self._lock:
+            for city_name, lat, lon, display_name in places:
+                key = normalize_city_name(city_name)
+                if not key:
+                    continue
+                if key in self._entries:
+                    self._drop_from_index(key)
+                bisect.insort(self._prefix_index, (key, display_name))
+                self._entries[key] = (lat, lon, display_name, fetched_at)
+                self._entries.move_to_end(key)
+                self._touched.discard(key)
+                rows.append((key, display_name, lat, lon, fetched_at, now))
+            self._conn.executemany("INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._evict()
+            self._flush_touched()
+            self._conn.commit()
+        return len(rows)
+
+    def suggest(self, prefix, limit=8):
+        key = normalize_city_name(prefix)
+        if not key:
+            return []
+        suggestions = []
+        with self._lock:
+            start = bisect.bisect_left(self._prefix_index, (key,))
+            for entry_key, display_name in self._prefix_index[start:]:
+                if not entry_key.startswith(key) or len(suggestions) >= limit:
+                    break
+                if display_name not in suggestions:
+                    suggestions.append(display_name)
+        return suggestions
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def flush(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    def _flush_touched(self):
+        if not self._touched:
+            return
+        now = time.time()
+        self._conn.executemany("UPDATE places SET last_used = ? WHERE key = ?", [(now, key) for key in self._touched])
+        self._touched.clear()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        self._touched.discard(key)
+        self._drop_from_index(key)
+        self._conn.execute("DELETE FROM places WHERE key = ?", (key,))
+
+    def _drop_from_index(self, key):
+        i = bisect.bisect_left(self._prefix_index, (key,))
+        while i < len(self._prefix_index) and self._prefix_index[i][0] == key:
+            del self._prefix_index[i]
+
+    def seed_from_file(self, path):
+        if path.endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                records = json.load(f)
+        else:
+            with open(path, newline="", encoding="utf-8") as f:
+                records = list(csv.DictReader(f))
+        places = []
+        for record in records:
+            name = record.get("name")
+            if not name:
+                continue
+            display_name = format_display_name(record)
+            places.append((name, float(record["latitude"]), float(record["longitude"]), display_name))
+            places.append((display_name, float(record["latitude"]), float(record["longitude"]), display_name))
+        return self.put_many(places)
+
+def format_display_name(result):
+    display_name = result.get('name')
+    if result.get('admin1'):
+        display_name += f", {result['admin1']}"
+    if result.get('country'):
+        display_name += f", {result['country']}"
+    return display_name
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_geocoding_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = GeocodingCache()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Geocoding cache unavailable: {e}")
+                return None
+        return _default_cache
@@ -0,0 +1,138 @@
+import bisect
+import datetime
+import sqlite3
+import threading
+from array import array
+
+from storage import get_cache_path
+from timeseries import TimeSeries, rolling_sum
+
+HISTORY_FILENAME = "history.sqlite3"
+HISTORY_HOURLY_FIELDS = (
+    "temperature_2m",
+    "apparent_temperature",
+    "relative_humidity_2m",
+    "precipitation",
+    "rain",
+    "snowfall",
+    "cloud_cover",
+    "wind_speed_10m"
+)
+COORDINATE_PRECISION = 2
+NAN = float("nan")
+
+def make_location_key(lat, lon, timezone):
+    return f"{round(lat, COORDINATE_PRECISION):.{COORDINATE_PRECISION}f},{round(lon, COORDINATE_PRECISION):.{COORDINATE_PRECISION}f}|{timezone}"
+
+def _to_column(rows, index):
+    return array('d', (NAN if row[index] is None else row[index] for row in rows))
+
+class HistoryStore:
+    def __init__(self, path=None):
+        self.path = path or get_cache_path(HISTORY_FILENAME)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        columns = ", ".join(f"{field} REAL" for field in HISTORY_HOURLY_FIELDS)
+        # (location, time) is the primary key of a WITHOUT ROWID table, so rows
+        # are stored clustered by location and in time order, and range scans
+        # read contiguous pages.
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS hourly (location TEXT NOT NULL, time TEXT NOT NULL, {columns}, "
+            "PRIMARY KEY (location, time)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def coverage(self, location):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT MIN(time), MAX(time) FROM hourly WHERE location = ?", (location,)
+            ).fetchone()
+
+    def missing_ranges(self, location, start_date, end_date):
+        first, last = self.coverage(location)
+        if first is None:
+            return [(start_date, end_date)]
+        first_date = datetime.date.fromisoformat(first[:10])
+        last_date = datetime.date.fromisoformat(last[:10])
+        if not last.endswith("23:00"):
+            # The newest stored day is incomplete, so it is fetched again.
+            last_date -= datetime.timedelta(days=1)
+        ranges = []
+        if start_date < first_date:
+            ranges.append((start_date, min(end_date, first_date - datetime.timedelta(days=1))))
+        if end_date > last_date:
+            ranges.append((max(start_date, last_date + datetime.timedelta(days=1)), end_date))
+        return ranges
+
+    def append(self, location, hourly):
+        times = hourly.get('time') or []
+        columns = [hourly.get(field) or [None] * len(times) for field in HISTORY_HOURLY_FIELDS]
+        rows = [(location, time, *values) for time, *values in zip(times, *columns)]
+        placeholders = ", ".join("?" * (len(HISTORY_HOURLY_FIELDS) + 2))
+        with self._lock:
+            self._conn.executemany(f"INSERT OR REPLACE INTO hourly VALUES ({placeholders})", rows)
+            self._conn.commit()
+        return len(rows)
+
+    def query(self, location, start_date, end_date, fields=HISTORY_HOURLY_FIELDS):
+        fields = [field for field in fields if field in HISTORY_HOURLY_FIELDS]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT time, {', '.join(fields)} FROM hourly "
+                "WHERE location = ? AND time >= ? AND time < ? ORDER BY time",
+                (location, start_date.isoformat(), (end_date + datetime.timedelta(days=1)).isoformat())
+            ).fetchall()
+        columns = {'time': [row[0] for row in rows]}
+        for i, field in enumerate(fields, start=1):
+            columns[field] = _to_column(rows, i)
+        return TimeSeries(columns)
+
+    def daily_summary(self, location, start_date, end_date, rolling_days=7):
+        # The query starts early enough that the first day's rolling
+        # precipitation total covers a full window.
+        query_start = start_date - datetime.timedelta(days=rolling_days - 1)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT substr(time, 1, 10) AS day, MIN(temperature_2m), MAX(temperature_2m), AVG(temperature_2m), "
+                "SUM(precipitation), MAX(wind_speed_10m) FROM hourly "
+                "WHERE location = ? AND time >= ? AND time < ? GROUP BY day ORDER BY day",
+                (location, query_start.isoformat(), (end_date + datetime.timedelta(days=1)).isoformat())
+            ).fetchall()
+        precipitation = _to_column(rows, 4)
+        summary = TimeSeries({
+            'time': [row[0] for row in rows],
+            'temp_min': _to_column(rows, 1),
+            'temp_max': _to_column(rows, 2),
+            'temp_mean': _to_column(rows, 3),
+            'precipitation': precipitation,
+            'precipitation_rolling': rolling_sum(precipitation, rolling_days),
+            'wind_speed_max': _to_column(rows, 5)
+        })
+        first = bisect.bisect_left(summary.times, start_date.isoformat())
+        return summary.slice(first, len(summary))
+
+    def clear(self, location=None):
+        with self._lock:
+            if location is None:
+                self._conn.execute("DELETE FROM hourly")
+            else:
+                self._conn.execute("DELETE FROM hourly WHERE location = ?", (location,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_history_store():
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            try:
+                _default_store = HistoryStore()
+            except (OSError, sqlite3.Error) as e:
+                print(f"History store unavailable: {e}")
+                return None
+        return _default_store
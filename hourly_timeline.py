@@ -0,0 +1,161 @@
+import math
+import tkinter as tk
+from tkinter import ttk
+
+from weather_api import convert_temperature
+
+COLUMN_WIDTH = 56
+CANVAS_HEIGHT = 192
+TIME_Y = 12
+TEMP_TEXT_Y = 30
+TEMP_TOP = 44
+TEMP_BOTTOM = 92
+PRECIP_TOP = 100
+PRECIP_BOTTOM = 140
+WIND_Y = 162
+UV_Y = 180
+
+class HourlyTimeline(ttk.Frame):
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.grid_columnconfigure(0, weight=1)
+        self.canvas = tk.Canvas(self, height=CANVAS_HEIGHT, background="#FFFFFF", highlightthickness=0)
+        self.canvas.grid(row=0, column=0, sticky="ew")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.on_scroll)
+        self.scrollbar.grid(row=1, column=0, sticky="ew")
+
+        self.series = None
+        self.unit = "celsius"
+        self.offset = 0
+        self.temp_range = (0.0, 1.0)
+        self.slots = []
+        self.temp_line = self.canvas.create_line(0, 0, 0, 0, fill="#FF7043", width=2, smooth=True, state="hidden")
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.canvas.bind("<MouseWheel>", self.on_mousewheel)
+        self.canvas.bind("<Shift-MouseWheel>", self.on_mousewheel)
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_by(-COLUMN_WIDTH * 3))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_by(COLUMN_WIDTH * 3))
+
+    def set_data(self, series, unit, start_index=0):
+        if series is not self.series:
+            self.series = series
+            self.offset = (start_index or 0) * COLUMN_WIDTH
+            self.temp_range = self._temperature_range(series)
+        self.unit = unit
+        self.redraw()
+
+    def _temperature_range(self, series):
+        if series is None or 'temperature_2m' not in series:
+            return (0.0, 1.0)
+        values = [v for v in series['temperature_2m'] if not math.isnan(v)]
+        if not values:
+            return (0.0, 1.0)
+        low, high = min(values), max(values)
+        return (low, high) if high > low else (low - 1, high + 1)
+
+    def content_width(self):
+        return len(self.series) * COLUMN_WIDTH if self.series is not None else 0
+
+    def max_offset(self):
+        return max(0, self.content_width() - self.canvas.winfo_width())
+
+    def on_resize(self, event=None):
+        self._ensure_slots()
+        self.redraw()
+
+    def on_scroll(self, action, value, units=None):
+        if action == "moveto":
+            self.offset = float(value) * self.content_width()
+        elif action == "scroll":
+            step = self.canvas.winfo_width() if units == "pages" else COLUMN_WIDTH
+            self.offset += int(value) * step
+        self.redraw()
+
+    def on_mousewheel(self, event):
+        self.scroll_by(-COLUMN_WIDTH * 3 if event.delta > 0 else COLUMN_WIDTH * 3)
+
+    def scroll_by(self, pixels):
+        self.offset += pixels
+        self.redraw()
+
+    def _ensure_slots(self):
+        # Only enough canvas items for the visible columns exist; scrolling
+        # rebinds them to different hours instead of creating new items.
+        needed = self.canvas.winfo_width() // COLUMN_WIDTH + 2
+        while len(self.slots) < needed:
+            self.slots.append({
+                "time": self.canvas.create_text(0, TIME_Y, fill="#888888", font=("Roboto", 9)),
+                "temp": self.canvas.create_text(0, TEMP_TEXT_Y, fill="#333333", font=("Roboto", 10, "bold")),
+                "precip": self.canvas.create_rectangle(0, 0, 0, 0, fill="#64B5F6", outline=""),
+                "precip_text": self.canvas.create_text(0, PRECIP_BOTTOM + 6, fill="#1E88E5", font=("Roboto", 8)),
+                "wind": self.canvas.create_text(0, WIND_Y, fill="#555555", font=("Roboto", 9)),
+                "uv": self.canvas.create_text(0, UV_Y, fill="#8E24AA", font=("Roboto", 9))
+            })
+
+    def redraw(self):
+        self._ensure_slots()
+        if self.series is None or len(self.series) == 0:
+            for slot in self.slots:
+                for item in slot.values():
+                    self.canvas.itemconfigure(item, state="hidden")
+            self.canvas.itemconfigure(self.temp_line, state="hidden")
+            self.scrollbar.set(0, 1)
+            return
+
+        self.offset = min(max(0, self.offset), self.max_offset())
+        first = int(self.offset // COLUMN_WIDTH)
+        shift = self.offset - first * COLUMN_WIDTH
+        count = len(self.series)
+        low, high = self.temp_range
+        unit_symbol = "°C" if self.unit == "celsius" else "°F"
+        line_points = []
+
+        for i, slot in enumerate(self.slots):
+            index = first + i
+            if index >= count:
+                for item in slot.values():
+                    self.canvas.itemconfigure(item, state="hidden")
+                continue
+            x = i * COLUMN_WIDTH - shift + COLUMN_WIDTH / 2
+
+            time_text = self.series.times[index][11:16]
+            if time_text == "00:00":
+                time_text = self.series.time_at(index).strftime('%a')
+            self.canvas.coords(slot["time"], x, TIME_Y)
+            self.canvas.itemconfigure(slot["time"], text=time_text, state="normal")
+
+            temp = self.series.value_at('temperature_2m', index)
+            if temp is not None:
+                display_temp = convert_temperature(temp, self.unit)
+                self.canvas.coords(slot["temp"], x, TEMP_TEXT_Y)
+                self.canvas.itemconfigure(slot["temp"], text=f"{display_temp:.0f}{unit_symbol}", state="normal")
+                y = TEMP_BOTTOM - (temp - low) / (high - low) * (TEMP_BOTTOM - TEMP_TOP)
+                line_points.extend((x, y))
+            else:
+                self.canvas.itemconfigure(slot["temp"], state="hidden")
+
+            pop = self.series.value_at('precipitation_probability', index) or 0
+            bar_top = PRECIP_BOTTOM - pop / 100 * (PRECIP_BOTTOM - PRECIP_TOP)
+            self.canvas.coords(slot["precip"], x - COLUMN_WIDTH / 4, bar_top, x + COLUMN_WIDTH / 4, PRECIP_BOTTOM)
+            self.canvas.itemconfigure(slot["precip"], state="normal")
+            self.canvas.coords(slot["precip_text"], x, PRECIP_BOTTOM + 6)
+            self.canvas.itemconfigure(slot["precip_text"], text=f"{pop:.0f}%", state="normal")
+
+            wind = self.series.value_at('wind_speed_10m', index)
+            self.canvas.coords(slot["wind"], x, WIND_Y)
+            self.canvas.itemconfigure(slot["wind"], text=f"{wind:.0f} km/h" if wind is not None else "--", state="normal")
+
+            uv = self.series.value_at('uv_index', index)
+            self.canvas.coords(slot["uv"], x, UV_Y)
+            self.canvas.itemconfigure(slot["uv"], text=f"UV {uv:.0f}" if uv is not None else "UV --", state="normal")
+
+        if len(line_points) >= 4:
+            self.canvas.coords(self.temp_line, *line_points)
+            self.canvas.itemconfigure(self.temp_line, state="normal")
+        else:
+            self.canvas.itemconfigure(self.temp_line, state="hidden")
+
+        width = self.content_width()
+        visible = self.canvas.winfo_width()
+        self.scrollbar.set(self.offset / width, min(1.0, (self.offset + visible) / width))
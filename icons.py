@@ -0,0 +1,100 @@
+import os
+import threading
+import tkinter as tk
+
+from storage import get_cache_path
+from weather_codes import get_icon_key, DEFAULT_ICON_KEY, NIGHT_SUFFIX
+
+ICON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons")
+ICON_CACHE_DIRNAME = "icons"
+DEFAULT_ICON = DEFAULT_ICON_KEY + ".png"
+# Night icons without their own artwork are the day icon darkened and
+# shifted towards blue, per RGB channel.
+NIGHT_TINT = (0.45, 0.5, 0.7)
+ICON_SIZES = {
+    "header": 50,
+    "daily": 50,
+    "hourly": 24
+}
+
+def get_display_scale(widget):
+    # Tk reports pixels per point; 96 DPI (4/3 px per point) is treated as 1x.
+    try:
+        scaling = float(widget.tk.call("tk", "scaling"))
+    except (tk.TclError, ValueError):
+        return 1.0
+    return max(1.0, round(scaling / (96 / 72) * 4) / 4)
+
+class IconAtlas:
+    def __init__(self, master, icon_dir=ICON_DIR, scale=None, cache_dir=None):
+        self.master = master
+        self.icon_dir = icon_dir
+        self.scale = scale if scale is not None else get_display_scale(master)
+        self.cache_dir = cache_dir
+        self._images = {}
+        self._lock = threading.Lock()
+
+    def get(self, weather_code, size="daily", is_day=True):
+        filename = get_icon_key(weather_code, is_day) + ".png"
+        icon = self.get_file(filename, size)
+        if icon is None and filename != DEFAULT_ICON:
+            icon = self.get_file(DEFAULT_ICON, size)
+        return icon
+
+    def get_file(self, filename, size="daily"):
+        pixels = self.pixels_for(size)
+        key = (filename, pixels)
+        with self._lock:
+            if key in self._images:
+                return self._images[key]
+        image = self._load(filename, pixels)
+        with self._lock:
+            self._images[key] = image
+        return image
+
+    def pixels_for(self, size):
+        base = ICON_SIZES[size] if isinstance(size, str) else size
+        return int(round(base * self.scale))
+
+    def _load(self, filename, pixels):
+        stem = os.path.splitext(filename)[0]
+        source_path = os.path.join(self.icon_dir, filename)
+        night = False
+        if stem.endswith(NIGHT_SUFFIX) and not os.path.exists(source_path):
+            source_path = os.path.join(self.icon_dir, stem[:-len(NIGHT_SUFFIX)] + ".png")
+            night = True
+        try:
+            mtime = int(os.stat(source_path).st_mtime)
+        except OSError:
+            return None
+        cached_path = None
+        try:
+            cache_dir = self.cache_dir or get_cache_path(ICON_CACHE_DIRNAME)
+            os.makedirs(cache_dir, exist_ok=True)
+            cached_path = os.path.join(cache_dir, f"{stem}-{pixels}px-{mtime}.png")
+            if os.path.exists(cached_path):
+                return tk.PhotoImage(master=self.master, file=cached_path)
+        except (OSError, tk.TclError):
+            cached_path = None
+        return self._render(source_path, pixels, cached_path, night)
+
+    def _render(self, source_path, pixels, cached_path, night=False):
+        from PIL import Image, ImageTk
+        try:
+            with Image.open(source_path) as img:
+                img = img.convert("RGBA").resize((pixels, pixels), Image.Resampling.LANCZOS)
+        except Exception:
+            return None
+        if night:
+            red, green, blue, alpha = img.split()
+            red, green, blue = (channel.point(lambda v, f=factor: int(v * f))
+                                for channel, factor in zip((red, green, blue), NIGHT_TINT))
+            img = Image.merge("RGBA", (red, green, blue, alpha))
+        if cached_path is not None:
+            try:
+                tmp_path = f"{cached_path}.{threading.get_ident()}.tmp"
+                img.save(tmp_path, format="PNG")
+                os.replace(tmp_path, cached_path)
+            except OSError:
+                pass
+        return ImageTk.PhotoImage(img, master=self.master)
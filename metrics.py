@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+METRICS_ENV = "WEATHER_APP_METRICS"
+METRICS_JSONL_ENV = "WEATHER_APP_METRICS_JSONL"
+RECENT_EVENTS = 200
+
+_enabled = bool(os.environ.get(METRICS_ENV) or os.environ.get(METRICS_JSONL_ENV))
+_jsonl_path = os.environ.get(METRICS_JSONL_ENV)
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+_recent = deque(maxlen=RECENT_EVENTS)
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.start, error=exc_type is not None)
+        return False
+
+def is_enabled():
+    return _enabled
+
+def enable(jsonl_path=None):
+    global _enabled, _jsonl_path
+    _enabled = True
+    if jsonl_path is not None:
+        _jsonl_path = jsonl_path
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _recent.clear()
+
+def span(name):
+    # Disabled instrumentation costs one global lookup and returns a shared
+    # no-op context manager.
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+def observe(name, seconds, error=False):
+    if not _enabled:
+        return
+    event = {"ts": time.time(), "span": name, "ms": round(seconds * 1000, 3)}
+    if error:
+        event["error"] = True
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = {"count": 0, "errors": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+        stats["count"] += 1
+        stats["errors"] += 1 if error else 0
+        stats["total"] += seconds
+        stats["last"] = seconds
+        if seconds > stats["max"]:
+            stats["max"] = seconds
+        _recent.append(event)
+    if _jsonl_path:
+        _write_jsonl(event)
+
+def incr(name, amount=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def snapshot():
+    with _lock:
+        return {
+            "spans": {name: dict(stats) for name, stats in _spans.items()},
+            "counters": dict(_counters)
+        }
+
+def recent_events():
+    with _lock:
+        return list(_recent)
+
+def _write_jsonl(event):
+    try:
+        with open(_jsonl_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event) + "\n")
+    except OSError:
+        pass
+
+def export_jsonl(path):
+    data = snapshot()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"ts": time.time(), **data}) + "\n")
+
+def export_prometheus():
+    data = snapshot()
+    lines = [
+        "# HELP weather_app_span_seconds Time spent in instrumented operations.",
+        "# TYPE weather_app_span_seconds summary"
+    ]
+    for name, stats in sorted(data["spans"].items()):
+        lines.append(f'weather_app_span_seconds_count{{span="{name}"}} {stats["count"]}')
+        lines.append(f'weather_app_span_seconds_sum{{span="{name}"}} {stats["total"]:.6f}')
+    lines.append("# HELP weather_app_span_max_seconds Slowest observed duration per span.")
+    lines.append("# TYPE weather_app_span_max_seconds gauge")
+    for name, stats in sorted(data["spans"].items()):
+        lines.append(f'weather_app_span_max_seconds{{span="{name}"}} {stats["max"]:.6f}')
+    lines.append("# HELP weather_app_events_total Counted events such as cache hits and HTTP retries.")
+    lines.append("# TYPE weather_app_events_total counter")
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f'weather_app_events_total{{event="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+def format_overlay():
+    data = snapshot()
+    lines = []
+    for name, stats in sorted(data["spans"].items()):
+        avg = stats["total"] / stats["count"] * 1000 if stats["count"] else 0
+        lines.append(f"{name}: last {stats['last'] * 1000:.1f} ms, avg {avg:.1f} ms, n={stats['count']}")
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f"{name}: {value}")
+    return "\n".join(lines) or "No metrics recorded yet."
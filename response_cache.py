@@ -0,0 +1,206 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from storage import get_cache_path
+from timeseries import to_json_list
+
+RESPONSE_CACHE_DIRNAME = "responses"
+COORDINATE_PRECISION = 2
+FORECAST_REFRESH_SECONDS = 3600
+MAX_STALE_SECONDS = 6 * 3600
+MEMORY_MAX_BYTES = 16 * 1024 * 1024
+DISK_MAX_BYTES = 64 * 1024 * 1024
+
+def make_cache_key(lat, lon, timezone, forecast_days):
+    return f"{round(lat, COORDINATE_PRECISION):.{COORDINATE_PRECISION}f},{round(lon, COORDINATE_PRECISION):.{COORDINATE_PRECISION}f}|{timezone}|{forecast_days}"
+
+def next_refresh_time(fetched_at, interval=FORECAST_REFRESH_SECONDS):
+    # Open-Meteo refreshes forecasts hourly, so a response stays fresh until
+    # the next hour boundary after it was fetched.
+    return (int(fetched_at) // interval + 1) * interval
+
+class ResponseCache:
+    def __init__(self, directory=None, memory_max_bytes=MEMORY_MAX_BYTES, disk_max_bytes=DISK_MAX_BYTES,
+                 refresh_interval=FORECAST_REFRESH_SECONDS, max_stale=MAX_STALE_SECONDS):
+        self.directory = directory or get_cache_path(RESPONSE_CACHE_DIRNAME)
+        os.makedirs(self.directory, exist_ok=True)
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.refresh_interval = refresh_interval
+        self.max_stale = max_stale
+        self._lock = threading.RLock()
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._revalidating = set()
+        self._revalidate_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-revalidate")
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stale_served": 0,
+            "revalidations": 0,
+            "evictions": 0
+        }
+
+    def _path_for(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json.gz")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                tier = "memory_hits"
+        if entry is None:
+            entry = self._read_disk(key)
+            tier = "disk_hits"
+            if entry is not None:
+                with self._lock:
+                    self._store_memory(key, entry)
+        if entry is None or now - entry[0] > self.refresh_interval + self.max_stale:
+            with self._lock:
+                self.counters["misses"] += 1
+            return None
+        fetched_at, value, _ = entry
+        fresh = now < next_refresh_time(fetched_at, self.refresh_interval)
+        with self._lock:
+            self.counters[tier] += 1
+            if not fresh:
+                self.counters["stale_served"] += 1
+        return value, fresh
+
+    def is_fresh(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is None:
+            entry = self._read_disk(key)
+        return entry is not None and time.time() < next_refresh_time(entry[0], self.refresh_interval)
+
+    def put(self, key, value, fetched_at=None):
+        fetched_at = fetched_at or time.time()
+        encoded = json.dumps({"key": key, "fetched_at": fetched_at, "data": value}, separators=(",", ":"), default=to_json_list).encode("utf-8")
+        entry = (fetched_at, value, len(encoded))
+        with self._lock:
+            self._store_memory(key, entry)
+        self._write_disk(key, encoded)
+
+    def revalidate(self, key, fetch):
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+            self.counters["revalidations"] += 1
+
+        def run():
+            try:
+                value = fetch()
+                if value is not None:
+                    self.put(key, value)
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        self._revalidate_executor.submit(run)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_bytes
+        stats["disk_bytes"] = sum(size for _, size, _ in self._disk_entries())
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        for _, _, path in self._disk_entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _store_memory(self, key, entry):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous[2]
+        self._memory[key] = entry
+        self._memory_bytes += entry[2]
+        while self._memory_bytes > self.memory_max_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted[2]
+            self.counters["evictions"] += 1
+
+    def _read_disk(self, key):
+        path = self._path_for(key)
+        try:
+            with gzip.open(path, "rb") as f:
+                raw = f.read()
+        except (OSError, EOFError):
+            return None
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            return None
+        if payload.get("key") != key:
+            return None
+        return payload["fetched_at"], payload["data"], len(raw)
+
+    def _write_disk(self, key, encoded):
+        path = self._path_for(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with gzip.open(tmp_path, "wb", compresslevel=5) as f:
+                f.write(encoded)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing response cache: {e}")
+            return
+        self._enforce_disk_budget()
+
+    def _disk_entries(self):
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for dir_entry in it:
+                    if dir_entry.name.endswith(".json.gz"):
+                        stat = dir_entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+        except OSError:
+            pass
+        return entries
+
+    def _enforce_disk_budget(self):
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.counters["evictions"] += 1
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_response_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = ResponseCache()
+            except OSError as e:
+                print(f"Response cache unavailable: {e}")
+                return None
+        return _default_cache
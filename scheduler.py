@@ -0,0 +1,67 @@
+import random
+import time
+
+DEFAULT_REFRESH_INTERVAL = 3600
+DEFAULT_SETTLE_DELAY = 300
+DEFAULT_JITTER = 120
+DEFAULT_BACKOFF_BASE = 30
+DEFAULT_BACKOFF_MAX = 1800
+
+class RefreshScheduler:
+    def __init__(self, widget, refresh, is_fresh=None, interval=DEFAULT_REFRESH_INTERVAL,
+                 settle_delay=DEFAULT_SETTLE_DELAY, jitter=DEFAULT_JITTER,
+                 backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX):
+        self.widget = widget
+        self.refresh = refresh
+        self.is_fresh = is_fresh
+        self.interval = interval
+        self.settle_delay = settle_delay
+        self.jitter = jitter
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failures = 0
+        self.next_run_at = None
+        self._job = None
+
+    def start(self):
+        self._schedule(self.next_aligned_delay())
+
+    def stop(self):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self.next_run_at = None
+
+    def next_aligned_delay(self, now=None):
+        # Forecasts update on the hour; poll shortly after the next boundary,
+        # spread out by jitter so many displays do not refresh in lockstep.
+        # The modulo keeps the delay within one interval, and jitter is capped
+        # at half of it, so intervals shorter than the settle delay still hold.
+        now = now if now is not None else time.time()
+        delay = (self.settle_delay - now) % self.interval or self.interval
+        return delay + random.uniform(0, min(self.jitter, self.interval / 2))
+
+    def backoff_delay(self):
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (self.failures - 1))
+        return delay + random.uniform(0, min(self.jitter, delay / 2))
+
+    def on_success(self):
+        self.failures = 0
+        self._schedule(self.next_aligned_delay())
+
+    def on_failure(self):
+        self.failures += 1
+        self._schedule(self.backoff_delay())
+
+    def _schedule(self, delay):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+        self.next_run_at = time.time() + delay
+        self._job = self.widget.after(int(delay * 1000), self._run)
+
+    def _run(self):
+        self._job = None
+        if self.is_fresh is not None and self.is_fresh():
+            self._schedule(self.next_aligned_delay())
+            return
+        self.refresh()
@@ -0,0 +1,128 @@
+import base64
+import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+from geocache import normalize_city_name
+from storage import get_cache_path, load_json, save_json
+from timeseries import TimeSeries
+
+SNAPSHOT_DIRNAME = "snapshots"
+# WSN1 files held pickles; they are no longer read and are replaced on the
+# next save.
+SNAPSHOT_MAGIC = b"WSN2"
+LATEST_SNAPSHOT_FILENAME = "latest_snapshot.json"
+
+def _encode_value(value):
+    # Snapshots are plain JSON so loading one cannot run code. Datetimes and
+    # series are tagged objects; series columns keep TimeSeries' packed
+    # float buffers, base64 encoded.
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, TimeSeries):
+        state = value.__getstate__()
+        return {"__timeseries__": {
+            "times": state["times"],
+            "columns": {field: base64.b64encode(data).decode("ascii") for field, data in state["columns"].items()}
+        }}
+    raise TypeError(f"Cannot store {type(value).__name__} in a snapshot")
+
+def _decode_object(obj):
+    if "__datetime__" in obj:
+        return datetime.datetime.fromisoformat(obj["__datetime__"])
+    if "__timeseries__" in obj:
+        state = obj["__timeseries__"]
+        series = TimeSeries({})
+        series.__setstate__({
+            "times": state["times"],
+            "columns": {field: base64.b64decode(data) for field, data in state["columns"].items()}
+        })
+        return series
+    return obj
+
+class SnapshotStore:
+    def __init__(self, directory=None):
+        self.directory = directory or get_cache_path(SNAPSHOT_DIRNAME)
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path_for(self, location_name):
+        digest = hashlib.sha1(normalize_city_name(location_name).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + ".bin")
+
+    def save(self, location_name, display_location, coordinates, parsed_data, saved_at=None):
+        snapshot = {
+            "location_name": location_name,
+            "display_location": display_location,
+            "coordinates": coordinates,
+            "parsed_data": parsed_data,
+            "saved_at": saved_at or time.time()
+        }
+        try:
+            encoded = json.dumps(snapshot, separators=(",", ":"), default=_encode_value).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            print(f"Error saving snapshot: {e}")
+            return
+        payload = SNAPSHOT_MAGIC + zlib.compress(encoded, 6)
+        path = self._path_for(location_name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Error saving snapshot: {e}")
+                return
+            save_json(LATEST_SNAPSHOT_FILENAME, {"location_name": location_name})
+
+    def load(self, location_name):
+        try:
+            with open(self._path_for(location_name), "rb") as f:
+                payload = f.read()
+        except OSError:
+            return None
+        if not payload.startswith(SNAPSHOT_MAGIC):
+            return None
+        try:
+            snapshot = json.loads(zlib.decompress(payload[len(SNAPSHOT_MAGIC):]), object_hook=_decode_object)
+        except (zlib.error, ValueError, KeyError, TypeError):
+            return None
+        if not isinstance(snapshot, dict):
+            return None
+        if normalize_city_name(snapshot.get("location_name", "")) != normalize_city_name(location_name):
+            return None
+        return snapshot
+
+    def load_latest(self):
+        latest = load_json(LATEST_SNAPSHOT_FILENAME)
+        if not latest or not latest.get("location_name"):
+            return None
+        return self.load(latest["location_name"])
+
+def format_age(seconds):
+    if seconds < 90:
+        return "just now"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min ago"
+    if seconds < 2 * 86400:
+        return f"{seconds / 3600:.0f} h ago"
+    return f"{seconds / 86400:.0f} days ago"
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_snapshot_store():
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            try:
+                _default_store = SnapshotStore()
+            except OSError as e:
+                print(f"Snapshot store unavailable: {e}")
+                return None
+        return _default_store
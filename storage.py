@@ -0,0 +1,32 @@
+import json
+import os
+
+CACHE_DIR_ENV = "WEATHER_APP_CACHE_DIR"
+
+def get_cache_dir():
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        cache_dir = os.path.join(base, "weather_app")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+def get_cache_path(filename):
+    return os.path.join(get_cache_dir(), filename)
+
+def load_json(filename, default=None):
+    try:
+        with open(get_cache_path(filename), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_json(filename, data):
+    path = get_cache_path(filename)
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Error saving {filename}: {e}")
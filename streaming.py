@@ -0,0 +1,168 @@
+import codecs
+import json
+import re
+from array import array
+from json.decoder import scanstring
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r'[,}\]\s]')
+_SEPARATORS = re.compile(r'[\s,]*')
+_decoder = json.JSONDecoder()
+
+def _flat_array_end(text, start):
+    # Open-Meteo series are flat arrays of numbers or plain strings, so the
+    # first "]" closes them unless a string or nested container is involved.
+    close = text.find(']', start)
+    if close < 0:
+        return None, False
+    segment = text[start + 1:close]
+    if '\\' in segment or '[' in segment or '{' in segment or segment.count('"') % 2:
+        return None, True
+    return close + 1, True
+
+class _ValueEnd:
+    # Resumable scanner that finds where a JSON value ends without decoding
+    # it. Flat arrays are skipped in one step; anything else is walked
+    # structural character by structural character.
+    def __init__(self, text, start):
+        self.pos = start
+        self.depth = 0
+        self.in_string = False
+        self.scalar = text[start] not in '[{"'
+
+    def feed(self, text):
+        if self.scalar:
+            match = _SCALAR_END.search(text, self.pos)
+            if match is None:
+                self.pos = len(text)
+                return None
+            return match.start()
+        while True:
+            if self.in_string:
+                match = _STRING_SPECIAL.search(text, self.pos)
+                if match is None:
+                    self.pos = len(text)
+                    return None
+                if match.group() == '\\':
+                    if match.end() >= len(text):
+                        self.pos = match.start()
+                        return None
+                    self.pos = match.end() + 1
+                    continue
+                self.in_string = False
+                self.pos = match.end()
+                if self.depth == 0:
+                    return self.pos
+                continue
+            match = _STRUCTURAL.search(text, self.pos)
+            if match is None:
+                self.pos = len(text)
+                return None
+            char = match.group()
+            if char == '[':
+                end, complete = _flat_array_end(text, match.start())
+                if end is not None:
+                    self.pos = end
+                    if self.depth == 0:
+                        return self.pos
+                    continue
+                if not complete:
+                    self.pos = match.start()
+                    return None
+            self.pos = match.end()
+            if char == '"':
+                self.in_string = True
+            elif char in '[{':
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    return self.pos
+
+def iter_object_members(chunks):
+    # Yields (key, raw JSON text) for each member of a top-level object as
+    # soon as the member is complete, without waiting for the whole body.
+    buffer = ""
+    pos = None
+    scanner = None
+    key = value_start = None
+    for chunk in chunks:
+        buffer += chunk
+        if pos is None:
+            start = buffer.find('{')
+            if start < 0:
+                continue
+            pos = start + 1
+        while True:
+            if scanner is None:
+                pos = _SEPARATORS.match(buffer, pos).end()
+                if pos >= len(buffer):
+                    break
+                if buffer[pos] == '}':
+                    return
+                if buffer[pos] != '"':
+                    raise ValueError(f"Expected an object key at offset {pos}")
+                try:
+                    key, key_end = scanstring(buffer, pos + 1)
+                except ValueError:
+                    break
+                colon = _SEPARATORS.match(buffer, key_end).end()
+                if colon >= len(buffer):
+                    break
+                value_start = _SEPARATORS.match(buffer, colon + 1).end()
+                if value_start >= len(buffer):
+                    break
+                scanner = _ValueEnd(buffer, value_start)
+            end = scanner.feed(buffer)
+            if end is None:
+                break
+            yield key, buffer[value_start:end]
+            # Drop consumed text so large payloads are not held twice.
+            buffer = buffer[end:]
+            pos = 0
+            scanner = None
+    # Running out of input before the closing brace means the body was not a
+    # JSON object (an HTML error page, say) or was cut off mid-transfer.
+    if pos is None:
+        raise ValueError("Response does not contain a JSON object")
+    raise ValueError("Response ended before the JSON object was closed")
+
+def parse_number_array(text):
+    body = text.strip()[1:-1]
+    if not body.strip():
+        return array('d')
+    # float() accepts "nan", so JSON nulls become NaN without a Python-level loop.
+    return array('d', map(float, body.replace("null", "nan").split(',')))
+
+def parse_columns(text, fields):
+    columns = {}
+    for key, raw in iter_object_members([text]):
+        if key == 'time':
+            columns[key] = json.loads(raw)
+        elif key in fields:
+            columns[key] = parse_number_array(raw)
+    return columns
+
+def decode_forecast_stream(chunks, hourly_fields, on_current=None):
+    data = {}
+    for key, raw in iter_object_members(chunks):
+        if key == 'hourly':
+            data[key] = parse_columns(raw, hourly_fields)
+        else:
+            data[key] = _decoder.decode(raw)
+            if key == 'current' and on_current is not None:
+                on_current(data[key])
+    return data
+
+def iter_text_chunks(response, chunk_size=STREAM_CHUNK_SIZE):
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
@@ -0,0 +1,229 @@
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "benchmarks"))
+
+import geocache
+import history
+import response_cache
+import snapshots
+import weather_api
+from weather_api import convert_parsed_data
+from stub_server import StubServer
+from ui import WeatherUI, RESULT_POLL_INTERVAL_MS
+
+SERVER_LATENCY = 0.3
+# Anything the Tk thread runs has to finish well inside one server round trip.
+MAX_TK_CALLBACK_SECONDS = 0.05
+
+class FakeVar:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+class HeadlessWeatherUI:
+    # Runs WeatherUI's fetch pipeline without a display. after() callbacks are
+    # queued here and only run when the test pumps them on its own thread, the
+    # way the Tk event loop would.
+    load_weather_data = WeatherUI.load_weather_data
+    _fetch_weather = WeatherUI._fetch_weather
+    _poll_fetch_results = WeatherUI._poll_fetch_results
+    toggle_units = WeatherUI.toggle_units
+
+    def __init__(self, location_name):
+        self.location_name = location_name
+        self.resolved_location = None
+        self.current_unit = "celsius"
+        self.unit_var = FakeVar(self.current_unit)
+        self.parsed_data = None
+        self.display_location = None
+        self.saved_location_labels = {}
+        self.rendered = []
+        self.snapshot_store = None
+        self.fetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="weather-fetch")
+        self.fetch_results = queue.Queue()
+        self.fetch_generation = 0
+        self.pending_future = None
+        self.pending_location = None
+        self.pending_forced = False
+        self.poll_job = None
+        self.callbacks = []
+        self.applied = []
+        self.previews = []
+        self.slowest_callback = 0.0
+
+    def after(self, delay_ms, callback):
+        self.callbacks.append(callback)
+        return len(self.callbacks)
+
+    def pump(self, timeout=10):
+        deadline = time.monotonic() + timeout
+        while self.callbacks:
+            if time.monotonic() > deadline:
+                raise AssertionError("fetch results were not applied in time")
+            callback = self.callbacks.pop(0)
+            start = time.perf_counter()
+            callback()
+            self.slowest_callback = max(self.slowest_callback, time.perf_counter() - start)
+            time.sleep(RESULT_POLL_INTERVAL_MS / 1000)
+
+    def _apply_fetch_result(self, generation, status, payload, display_location, coordinates):
+        self.pending_future = None
+        self.applied.append((threading.current_thread(), generation, status, payload))
+        if status == "ok":
+            self.parsed_data = payload
+            self.display_location = display_location
+            self.update_ui(payload, display_location)
+
+    def update_ui(self, parsed_data, display_location):
+        self.rendered.append(convert_parsed_data(parsed_data, self.current_unit))
+
+    def show_current_preview(self, current, display_location):
+        self.previews.append(threading.current_thread())
+
+    def close(self):
+        self.fetch_executor.shutdown(wait=True)
+
+class StubServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="weather-test-")
+        self.saved_env = os.environ.get("WEATHER_APP_CACHE_DIR")
+        os.environ["WEATHER_APP_CACHE_DIR"] = self.cache_dir
+        geocache._default_cache = None
+        response_cache._default_cache = None
+        snapshots._default_store = None
+        history._default_store = None
+        self.stub = StubServer(latency=SERVER_LATENCY, jitter=0).start()
+        self.saved_urls = (weather_api.GEOCODING_URL, weather_api.OPEN_METEO_BASE_URL, weather_api.OPEN_METEO_AIR_QUALITY_URL)
+        weather_api.GEOCODING_URL = self.stub.urls["WEATHER_APP_GEOCODING_URL"]
+        weather_api.OPEN_METEO_BASE_URL = self.stub.urls["WEATHER_APP_FORECAST_URL"]
+        weather_api.OPEN_METEO_AIR_QUALITY_URL = self.stub.urls["WEATHER_APP_AIR_QUALITY_URL"]
+        self.ui = HeadlessWeatherUI("Nairobi")
+
+    def tearDown(self):
+        self.ui.close()
+        self.stub.stop()
+        weather_api.GEOCODING_URL, weather_api.OPEN_METEO_BASE_URL, weather_api.OPEN_METEO_AIR_QUALITY_URL = self.saved_urls
+        if self.saved_env is None:
+            os.environ.pop("WEATHER_APP_CACHE_DIR", None)
+        else:
+            os.environ["WEATHER_APP_CACHE_DIR"] = self.saved_env
+        geocache._default_cache = None
+        response_cache._default_cache = None
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+class FetchPipelineTest(StubServerTestCase):
+    def test_load_does_not_block_tk_thread(self):
+        start = time.perf_counter()
+        self.ui.load_weather_data()
+        self.assertLess(time.perf_counter() - start, MAX_TK_CALLBACK_SECONDS)
+        self.ui.pump()
+        self.assertLess(self.ui.slowest_callback, MAX_TK_CALLBACK_SECONDS)
+        self.assertEqual([entry[2] for entry in self.ui.applied], ["ok"])
+
+    def test_results_reach_ui_only_through_queue(self):
+        self.ui.load_weather_data()
+        future = self.ui.pending_future
+        future.result(timeout=10)
+        # The worker has finished, but nothing is shown until the Tk thread
+        # drains the queue.
+        self.assertEqual(self.ui.applied, [])
+        self.assertEqual(self.ui.previews, [])
+        self.assertFalse(self.ui.fetch_results.empty())
+        self.ui.pump()
+        self.assertTrue(self.ui.fetch_results.empty())
+        self.assertEqual(len(self.ui.applied), 1)
+        thread, generation, status, payload = self.ui.applied[0]
+        self.assertIs(thread, threading.main_thread())
+        self.assertEqual(status, "ok")
+        self.assertIn("current", payload)
+        for thread in self.ui.previews:
+            self.assertIs(thread, threading.main_thread())
+
+    def test_newer_generation_drops_in_flight_result(self):
+        self.ui.load_weather_data()
+        first = self.ui.pending_future
+        # Let the first fetch get onto the wire before the user searches again.
+        time.sleep(SERVER_LATENCY / 2)
+        self.assertTrue(first.running())
+        self.ui.location_name = "Mombasa"
+        self.ui.load_weather_data()
+        self.assertIsNot(self.ui.pending_future, first)
+        self.ui.pump()
+        first.result(timeout=10)
+        self.assertEqual([entry[1:3] for entry in self.ui.applied], [(2, "ok")])
+
+    def test_newer_generation_drops_queued_result(self):
+        self.ui.load_weather_data()
+        self.ui.pending_future.result(timeout=10)
+        self.assertFalse(self.ui.fetch_results.empty())
+        self.ui.location_name = "Mombasa"
+        self.ui.load_weather_data()
+        self.ui.pump()
+        self.assertEqual([entry[1:3] for entry in self.ui.applied], [(2, "ok")])
+
+    def test_same_location_shares_pending_fetch(self):
+        self.ui.load_weather_data()
+        first = self.ui.pending_future
+        self.ui.load_weather_data()
+        self.assertIs(self.ui.pending_future, first)
+        self.assertEqual(self.ui.fetch_generation, 1)
+        self.ui.pump()
+        self.assertEqual([entry[1:3] for entry in self.ui.applied], [(1, "ok")])
+
+    def test_resolved_location_skips_geocoding(self):
+        self.ui.location_name = "Nairobi, Nairobi Area, Kenya"
+        self.ui.resolved_location = (-1.28333, 36.81667, "Nairobi, Nairobi Area, Kenya")
+        self.ui.load_weather_data()
+        self.ui.pump()
+        self.assertEqual([entry[2] for entry in self.ui.applied], ["ok"])
+        self.assertEqual(self.ui.display_location, "Nairobi, Nairobi Area, Kenya")
+        # Forecast and air quality only.
+        self.assertEqual(self.stub.request_count, 2)
+
+class UnitToggleTest(StubServerTestCase):
+    def toggle(self, unit):
+        self.ui.unit_var.set(unit)
+        self.ui.toggle_units()
+        return self.ui.rendered[-1]['current']['temp']
+
+    def test_toggle_makes_no_requests(self):
+        self.ui.load_weather_data()
+        self.ui.pump()
+        celsius = self.ui.parsed_data['current']['temp']
+        requests_before = self.stub.request_count
+        self.assertAlmostEqual(self.toggle("fahrenheit"), celsius * 9 / 5 + 32)
+        self.assertAlmostEqual(self.toggle("celsius"), celsius)
+        self.assertAlmostEqual(self.toggle("fahrenheit"), celsius * 9 / 5 + 32)
+        self.assertEqual(self.stub.request_count, requests_before)
+        self.assertEqual(self.ui.callbacks, [])
+
+    def test_toggle_rerenders_while_fetch_pending(self):
+        self.ui.load_weather_data()
+        self.ui.pump()
+        celsius = self.ui.parsed_data['current']['temp']
+        self.ui.location_name = "Mombasa"
+        self.ui.load_weather_data()
+        self.assertFalse(self.ui.pending_future.done())
+        rendered = len(self.ui.rendered)
+        self.assertAlmostEqual(self.toggle("fahrenheit"), celsius * 9 / 5 + 32)
+        self.assertEqual(len(self.ui.rendered), rendered + 1)
+        self.ui.pump()
+
+if __name__ == "__main__":
+    unittest.main()
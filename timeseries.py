@@ -0,0 +1,101 @@
+import bisect
+import datetime
+import math
+from array import array
+from itertools import accumulate, repeat
+from operator import sub
+
+def to_float_array(values):
+    return array('d', (math.nan if v is None else v for v in values))
+
+def to_json_list(values):
+    if isinstance(values, array):
+        return [None if math.isnan(v) else v for v in values]
+    return values
+
+def rolling_sum(values, window):
+    # Trailing window sums as differences of prefix sums. Meant for
+    # non-negative quantities such as precipitation: max(0.0, nan) is 0.0,
+    # so a missing value counts as zero instead of blanking later windows.
+    n = len(values)
+    lag = min(window, n + 1)
+    sums = list(accumulate(map(max, repeat(0.0, n), values), initial=0.0))
+    return array('d', map(sub, sums[1:], sums[:1] * (lag - 1) + sums[:n - lag + 1]))
+
+def nearest_time_index(times, target):
+    # Open-Meteo timestamps share one ISO format, so they sort as strings and
+    # can be bisected without converting the whole axis to datetimes.
+    if not times:
+        return None
+    i = bisect.bisect_left(times, target)
+    if i == 0:
+        return 0
+    if i == len(times):
+        return len(times) - 1
+    target_dt = datetime.datetime.fromisoformat(target)
+    before = target_dt - datetime.datetime.fromisoformat(times[i - 1])
+    after = datetime.datetime.fromisoformat(times[i]) - target_dt
+    return i - 1 if before <= after else i
+
+class TimeSeries:
+    def __init__(self, columns):
+        self.times = columns.get('time') or []
+        self._raw = {k: v for k, v in columns.items() if k != 'time' and not isinstance(v, array)}
+        self._columns = {k: v for k, v in columns.items() if isinstance(v, array)}
+
+    def __len__(self):
+        return len(self.times)
+
+    def __contains__(self, field):
+        return field in self._raw or field in self._columns
+
+    def fields(self):
+        return list(self._raw) + [k for k in self._columns if k not in self._raw]
+
+    def __getitem__(self, field):
+        column = self._columns.get(field)
+        if column is None:
+            column = to_float_array(self._raw[field])
+            self._columns[field] = column
+        return column
+
+    def get(self, field, default=None):
+        if field not in self:
+            return default
+        return self[field]
+
+    def value_at(self, field, index):
+        if index is None or field not in self:
+            return None
+        if field in self._columns:
+            value = self._columns[field][index]
+            return None if math.isnan(value) else value
+        return self._raw[field][index]
+
+    def time_at(self, index):
+        return datetime.datetime.fromisoformat(self.times[index])
+
+    def nearest_index(self, target):
+        return nearest_time_index(self.times, target)
+
+    def __getstate__(self):
+        # Snapshots store every column as a packed float buffer.
+        return {
+            'times': self.times,
+            'columns': {field: self[field].tobytes() for field in self.fields()}
+        }
+
+    def __setstate__(self, state):
+        self.times = state['times']
+        self._raw = {}
+        self._columns = {}
+        for field, data in state['columns'].items():
+            column = array('d')
+            column.frombytes(data)
+            self._columns[field] = column
+
+    def slice(self, start, stop):
+        series = TimeSeries({'time': self.times[start:stop]})
+        for field in self.fields():
+            series._columns[field] = self[field][start:stop]
+        return series
@@ -0,0 +1,139 @@
+import math
+import tkinter as tk
+from tkinter import ttk
+
+from weather_api import convert_temperature
+
+CANVAS_HEIGHT = 192
+SUMMARY_Y = 12
+TEMP_TOP = 34
+TEMP_BOTTOM = 120
+PRECIP_TOP = 132
+PRECIP_BOTTOM = 168
+DATE_Y = 182
+SIDE_PADDING = 24
+HISTORY_COLOR = "#90A4AE"
+FORECAST_COLOR = "#FF7043"
+PRECIP_COLOR = "#1E88E5"
+
+class TrendChart(ttk.Frame):
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.grid_columnconfigure(0, weight=1)
+        self.canvas = tk.Canvas(self, height=CANVAS_HEIGHT, background="#FFFFFF", highlightthickness=0)
+        self.canvas.grid(row=0, column=0, sticky="ew")
+
+        self.history = None
+        self.forecast = []
+        self.unit = "celsius"
+        self.message = "Loading history..."
+        self.bars = []
+        self.dates = []
+        self.summary_text = self.canvas.create_text(SIDE_PADDING, SUMMARY_Y, anchor="w", fill="#555555", font=("Roboto", 10))
+        self.today_line = self.canvas.create_line(0, 0, 0, 0, fill="#BDBDBD", dash=(3, 3), state="hidden")
+        self.mean_line = self.canvas.create_line(0, 0, 0, 0, fill="#546E7A", width=2, smooth=True, state="hidden")
+        self.precip_line = self.canvas.create_line(0, 0, 0, 0, fill=PRECIP_COLOR, width=2, state="hidden")
+        self.precip_label = self.canvas.create_text(SIDE_PADDING, PRECIP_TOP, anchor="nw", fill=PRECIP_COLOR,
+                                                    font=("Roboto", 8), state="hidden")
+
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+
+    def set_data(self, history, forecast, unit, message=None):
+        self.history = history
+        self.forecast = forecast or []
+        self.unit = unit
+        self.message = message
+        self.redraw()
+
+    def _ensure_items(self, count):
+        # Items are reused between redraws and surplus ones are hidden.
+        while len(self.bars) < count:
+            self.bars.append(self.canvas.create_line(0, 0, 0, 0, width=4, capstyle=tk.ROUND))
+        while len(self.dates) < count:
+            self.dates.append(self.canvas.create_text(0, DATE_Y, fill="#888888", font=("Roboto", 8)))
+        for item in self.bars[count:] + self.dates[count:]:
+            self.canvas.itemconfigure(item, state="hidden")
+
+    def _days(self):
+        days = []
+        if self.history is not None:
+            # History is stored in Celsius; forecast rows arrive already converted.
+            for i, date in enumerate(self.history.times):
+                days.append((date, convert_temperature(self.history.value_at('temp_min', i), self.unit),
+                             convert_temperature(self.history.value_at('temp_max', i), self.unit), False))
+        for day in self.forecast:
+            days.append((day['dt'].date().isoformat(), day['temp_min'], day['temp_max'], True))
+        return days
+
+    def redraw(self):
+        days = self._days()
+        history_days = len(self.history) if self.history is not None else 0
+        if self.message or not history_days:
+            self._ensure_items(0)
+            for item in (self.today_line, self.mean_line, self.precip_line, self.precip_label):
+                self.canvas.itemconfigure(item, state="hidden")
+            self.canvas.itemconfigure(self.summary_text, text=self.message or "No history available.")
+            return
+        self._ensure_items(len(days))
+
+        temps = [t for _, low, high, _ in days for t in (low, high) if t is not None]
+        low_bound, high_bound = (min(temps), max(temps)) if temps else (0.0, 1.0)
+        if high_bound <= low_bound:
+            low_bound, high_bound = low_bound - 1, high_bound + 1
+        width = max(self.canvas.winfo_width(), SIDE_PADDING * 2 + len(days))
+        step = (width - SIDE_PADDING * 2) / len(days)
+
+        def temp_y(value):
+            return TEMP_BOTTOM - (value - low_bound) / (high_bound - low_bound) * (TEMP_BOTTOM - TEMP_TOP)
+
+        for i, (date, low, high, is_forecast) in enumerate(days):
+            x = SIDE_PADDING + step * (i + 0.5)
+            bar, label = self.bars[i], self.dates[i]
+            if low is None or high is None:
+                self.canvas.itemconfigure(bar, state="hidden")
+            else:
+                self.canvas.coords(bar, x, temp_y(high), x, temp_y(low))
+                self.canvas.itemconfigure(bar, fill=FORECAST_COLOR if is_forecast else HISTORY_COLOR, state="normal")
+            if i % 7 == 0 or i == history_days:
+                self.canvas.coords(label, x, DATE_Y)
+                self.canvas.itemconfigure(label, text=date[5:].replace("-", "/"), state="normal")
+            else:
+                self.canvas.itemconfigure(label, state="hidden")
+
+        today_x = SIDE_PADDING + step * history_days
+        self.canvas.coords(self.today_line, today_x, TEMP_TOP - 4, today_x, PRECIP_BOTTOM)
+        self.canvas.itemconfigure(self.today_line, state="normal" if self.forecast else "hidden")
+
+        mean_points = []
+        for i, mean in enumerate(self.history['temp_mean']):
+            if not math.isnan(mean):
+                mean_points.extend((SIDE_PADDING + step * (i + 0.5), temp_y(convert_temperature(mean, self.unit))))
+        self._set_line(self.mean_line, mean_points)
+
+        rolling = self.history['precipitation_rolling']
+        top = max(max(rolling), 1.0)
+        precip_points = []
+        for i, total in enumerate(rolling):
+            precip_points.extend((SIDE_PADDING + step * (i + 0.5), PRECIP_BOTTOM - total / top * (PRECIP_BOTTOM - PRECIP_TOP)))
+        self._set_line(self.precip_line, precip_points)
+        self.canvas.itemconfigure(self.precip_label, text=f"7-day rain (max {top:.0f} mm)", state="normal")
+        self.canvas.itemconfigure(self.summary_text, text=self._summary())
+
+    def _set_line(self, item, points):
+        if len(points) >= 4:
+            self.canvas.coords(item, *points)
+            self.canvas.itemconfigure(item, state="normal")
+        else:
+            self.canvas.itemconfigure(item, state="hidden")
+
+    def _summary(self):
+        highs = [v for v in self.history['temp_max'] if not math.isnan(v)]
+        unit_symbol = "°C" if self.unit == "celsius" else "°F"
+        if not highs:
+            return f"Last {len(self.history)} days"
+        average = convert_temperature(sum(highs) / len(highs), self.unit)
+        text = f"Last {len(self.history)} days: average high {average:.0f}{unit_symbol}"
+        today = self.forecast[0]['temp_max'] if self.forecast else None
+        if today is not None:
+            text += f", today {today:.0f}{unit_symbol} ({today - average:+.0f}°)"
+        return text
@@ -1,89 +1,117 @@
 import tkinter as tk
 from tkinter import ttk, StringVar
 import datetime
-from weather_api import get_coordinates, get_weather_data, parse_weather_data, get_weather_description
-from PIL import Image, ImageTk
+from weather_api import (get_coordinates, get_weather_data, get_weather_data_batch, parse_weather_data,
+                         convert_parsed_data, convert_temperature, is_weather_data_fresh,
+                         search_locations, get_history, GEOCODING_SEARCH_COUNT)
+from geocache import get_geocoding_cache, normalize_city_name
+from storage import load_json, save_json
+from snapshots import get_snapshot_store, format_age
+from scheduler import RefreshScheduler, DEFAULT_REFRESH_INTERVAL
+import metrics
+from icons import IconAtlas
+from aqi import aqi_category, POLLUTANT_LABELS
+from hourly_timeline import HourlyTimeline
+from trend_chart import TrendChart
+from weather_codes import get_weather_description
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import queue
 import os
+import time
+
+RESULT_POLL_INTERVAL_MS = 16
+SAVED_LOCATIONS_FILENAME = "saved_locations.json"
+DAILY_FORECAST_DAYS = 7
+RENDER_TIMING_ENV = "WEATHER_APP_RENDER_TIMING"
+REFRESH_INTERVAL_ENV = "WEATHER_APP_REFRESH_INTERVAL"
+DEBUG_OVERLAY_REFRESH_MS = 1000
+DAILY_AQI_SCHEME = "us"
+AUTOCOMPLETE_DEBOUNCE_MS = 250
+AUTOCOMPLETE_MIN_CHARS = 2
+# Open-Meteo only fuzzy-matches names of three or more characters.
+AUTOCOMPLETE_REMOTE_MIN_CHARS = 3
 
 class WeatherUI(tk.Frame):
     def __init__(self, master=None):
         super().__init__(master, bg="#F0F0F0")
         self.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         self.location_name = "Mombasa"
+        # (lat, lon, display name) when the location is already known, as for
+        # saved locations, so fetches skip geocoding.
+        self.resolved_location = None
+        self.snapshot_store = get_snapshot_store()
+        startup_snapshot = self.snapshot_store.load_latest() if self.snapshot_store is not None else None
+        if startup_snapshot is not None:
+            self.location_name = startup_snapshot["location_name"]
+            if startup_snapshot["coordinates"]:
+                lat, lon = startup_snapshot["coordinates"]
+                self.resolved_location = (lat, lon, startup_snapshot["display_location"])
         self.current_unit = "celsius" # Default unit
+        self.parsed_data = None
+        self.display_location = None
+        self.current_coordinates = None
+        self.snapshot_saved_at = None
+        self.saved_locations = load_json(SAVED_LOCATIONS_FILENAME, [])
+        self.saved_location_labels = {}
+        self.saved_summaries = {}
         self.tile_labels = {}
-        self.daily_forecast_widgets = []
+        self.daily_forecast_cells = []
+        self.widget_state = {}
+        self.render_times = deque(maxlen=100)
+        self.report_render_times = bool(os.environ.get(RENDER_TIMING_ENV))
+        self.debug_overlay = None
+        self.debug_overlay_job = None
+        self.debug_overlay_enabled_metrics = False
         self.search_city_var = StringVar(self)
         self.search_city_var.set(self.location_name)
         self.unit_var = StringVar(self, value=self.current_unit) # To manage radiobutton selection
 
-        self.weather_icon_map = {
-            0: "0.png",
-            1: "1.png",
-            2: "2.png",
-            3: "3.png",
-            45: "45.png",
-            48: "45.png",
-            51: "51.png",
-            53: "51.png",
-            55: "51.png",
-            56: "51.png",
-            57: "51.png",
-            61: "61.png",
-            63: "61.png",
-            65: "61.png",
-            66: "61.png",
-            67: "61.png",
-            71: "71.png",
-            73: "71.png",
-            75: "71.png",
-            77: "71.png",
-            80: "80.png",
-            81: "80.png",
-            82: "80.png",
-            85: "71.png",
-            86: "71.png",
-            95: "95.png",
-            96: "95.png",
-            99: "95.png"
-        }
-        self.loaded_icons = {}
-        self._load_weather_icons()
+        # Fetches run on worker threads; results come back through this queue
+        # and are only applied if they belong to the latest request.
+        self.fetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="weather-fetch")
+        self.fetch_results = queue.Queue()
+        self.fetch_generation = 0
+        self.pending_future = None
+        self.pending_location = None
+        self.pending_forced = False
+        self.poll_job = None
+        self.saved_results = queue.Queue()
+        self.saved_refresh_future = None
+        self.saved_poll_job = None
+        self.autocomplete_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autocomplete")
+        self.autocomplete_results = queue.Queue()
+        self.autocomplete_generation = 0
+        self.autocomplete_future = None
+        self.autocomplete_job = None
+        self.autocomplete_poll_job = None
+        self.autocomplete_queried = set()
+        self.suggestions = []
+        self.history_mode = tk.BooleanVar(self, value=False)
+        self.history_summary = None
+        self.history_coordinates = None
+        self.history_results = queue.Queue()
+        self.history_generation = 0
+        self.history_future = None
+        self.history_poll_job = None
+
+        self.icon_atlas = IconAtlas(self)
 
         self.setup_styles()
         self.create_widgets()
+        if startup_snapshot is not None:
+            self.show_snapshot(startup_snapshot)
+        self.refresh_scheduler = RefreshScheduler(
+            self, self.scheduled_refresh, is_fresh=self.is_current_data_fresh,
+            interval=float(os.environ.get(REFRESH_INTERVAL_ENV) or DEFAULT_REFRESH_INTERVAL))
         self.load_weather_data()
+        self.refresh_scheduler.start()
+        self.master.bind("<F12>", self.toggle_debug_overlay)
+        if metrics.is_enabled():
+            self.toggle_debug_overlay()
 
-    def _load_weather_icons(self):
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        icon_dir = os.path.join(base_dir, "icons")
-        
-        for code, filename in self.weather_icon_map.items():
-            try:
-                img_path = os.path.join(icon_dir, filename)
-                img = Image.open(img_path)
-                img = img.resize((50, 50), Image.Resampling.LANCZOS)
-                self.loaded_icons[code] = ImageTk.PhotoImage(img)
-            except FileNotFoundError:
-                self.loaded_icons[code] = None
-            except Exception as e:
-                self.loaded_icons[code] = None
-
-        try:
-            default_icon_path = os.path.join(icon_dir, "default.png")
-            default_img = Image.open(default_icon_path)
-            default_img = default_img.resize((50, 50), Image.Resampling.LANCZOS)
-            self.loaded_icons["default"] = ImageTk.PhotoImage(default_img)
-        except FileNotFoundError:
-            self.loaded_icons["default"] = None
-        except Exception as e:
-            self.loaded_icons["default"] = None
-
-    def get_icon_for_code(self, weather_code):
-        icon = self.loaded_icons.get(weather_code)
-        if icon is None:
-            return self.loaded_icons.get("default")
-        return icon
+    def get_icon_for_code(self, weather_code, size="daily", is_day=True):
+        return self.icon_atlas.get(weather_code, size, is_day)
 
     def setup_styles(self):
         self.master.style = ttk.Style()
@@ -123,6 +151,15 @@ class WeatherUI(tk.Frame):
                                     background="#FFFFFF",
                                     foreground="#888888",
                                     font=("Roboto", 9))
+        self.master.style.configure("DailyAqi.TLabel",
+                                    background="#FFFFFF",
+                                    foreground="#333333",
+                                    font=("Roboto", 8, "bold"),
+                                    padding=(4, 0))
+        self.master.style.configure("AqiBreakdown.TLabel",
+                                    background="#FFFFFF",
+                                    foreground="#555555",
+                                    font=("Roboto", 9))
         self.master.style.configure("Search.TEntry",
                                     fieldbackground="#FFFFFF",
                                     foreground="#333333",
@@ -140,6 +177,12 @@ class WeatherUI(tk.Frame):
                                     font=("Roboto", 10, "bold"))
         self.master.style.map("Unit.TRadiobutton",
                               background=[('active', '#F0F0F0')])
+        self.master.style.configure("Unit.TCheckbutton",
+                                    background="#F0F0F0",
+                                    foreground="#555555",
+                                    font=("Roboto", 10, "bold"))
+        self.master.style.map("Unit.TCheckbutton",
+                              background=[('active', '#F0F0F0')])
 
     def create_widgets(self):
         self.grid_columnconfigure(0, weight=1)
@@ -148,7 +191,9 @@ class WeatherUI(tk.Frame):
         self.grid_rowconfigure(1, weight=0)
         self.grid_rowconfigure(2, weight=0)
         self.grid_rowconfigure(3, weight=0)
-        self.grid_rowconfigure(4, weight=1)
+        self.grid_rowconfigure(4, weight=0)
+        self.grid_rowconfigure(5, weight=1)
+        self.grid_rowconfigure(6, weight=0)
 
         self.search_frame = ttk.Frame(self, style="TFrame")
         self.search_frame.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 15), padx=5)
@@ -161,6 +206,16 @@ class WeatherUI(tk.Frame):
         self.search_button = ttk.Button(self.search_frame, text="Search", command=self.perform_search, style="Search.TButton")
         self.search_button.grid(row=0, column=1, sticky="e")
 
+        self.search_entry.bind("<KeyRelease>", self.on_search_key)
+        self.search_entry.bind("<Down>", self.focus_suggestions)
+        self.search_entry.bind("<Escape>", self.hide_suggestions)
+        self.suggestion_list = tk.Listbox(self, activestyle="none", font=("Roboto", 10), relief="flat",
+                                          background="#FFFFFF", foreground="#333333", selectbackground="#4CAF50",
+                                          highlightthickness=1, highlightbackground="#E0E0E0", exportselection=False)
+        self.suggestion_list.bind("<Return>", self.choose_suggestion)
+        self.suggestion_list.bind("<ButtonRelease-1>", self.choose_suggestion)
+        self.suggestion_list.bind("<Escape>", self.hide_suggestions)
+
         self.header_frame = ttk.Frame(self, style="TFrame")
         self.header_frame.grid(row=1, column=0, columnspan=2, sticky="nsew", pady=(0, 10))
         self.header_frame.grid_rowconfigure(0, weight=1)
@@ -194,6 +249,9 @@ class WeatherUI(tk.Frame):
         self.fahrenheit_radio = ttk.Radiobutton(self.unit_frame, text="°F", variable=self.unit_var, value="fahrenheit",
                                                 command=self.toggle_units, style="Unit.TRadiobutton")
         self.fahrenheit_radio.pack(anchor="e")
+        self.history_check = ttk.Checkbutton(self.unit_frame, text="History", variable=self.history_mode,
+                                             command=self.toggle_history_mode, style="Unit.TCheckbutton")
+        self.history_check.pack(anchor="e", pady=(5, 0))
         
         self.description_label = ttk.Label(self, text="Loading description...",
                                             font=("Roboto", 16),
@@ -203,9 +261,15 @@ class WeatherUI(tk.Frame):
 
         self.daily_forecast_container = ttk.Frame(self, style="DailyForecast.TFrame")
         self.daily_forecast_container.grid(row=3, column=0, columnspan=2, sticky="ew", pady=(0, 10), padx=5)
+        self.create_daily_forecast_cells()
+
+        self.hourly_timeline = HourlyTimeline(self, style="DailyForecast.TFrame")
+        self.hourly_timeline.grid(row=4, column=0, columnspan=2, sticky="ew", pady=(0, 10), padx=5)
+        # History mode swaps the hourly timeline for the trend chart in row 4.
+        self.trend_chart = TrendChart(self, style="DailyForecast.TFrame")
 
         self.tiles_frame = ttk.Frame(self, style="TFrame")
-        self.tiles_frame.grid(row=4, column=0, columnspan=2, sticky="nsew", pady=(0, 10), padx=5)
+        self.tiles_frame.grid(row=5, column=0, columnspan=2, sticky="nsew", pady=(0, 10), padx=5)
         self.tiles_frame.grid_columnconfigure(0, weight=1)
         self.tiles_frame.grid_columnconfigure(1, weight=1)
 
@@ -217,10 +281,33 @@ class WeatherUI(tk.Frame):
         self.tile_labels["sunrise"] = self.create_tile(self.tiles_frame, "Sunrise", "--:-- AM", row=2, col=1)
         self.tile_labels["sunset"] = self.create_tile(self.tiles_frame, "Sunset", "--:-- PM", row=3, col=0)
         self.tile_labels["wind_speed"] = self.create_tile(self.tiles_frame, "Wind Speed", "-- km/h", row=3, col=1)
-
-    def create_tile(self, parent_frame, label_text, value_text, row, col):
+        self.tile_labels["aqi"] = self.create_tile(self.tiles_frame, "Air Quality Index (US / EU)", "--", row=4, col=0, columnspan=2)
+        self.tile_labels["aqi_breakdown"] = ttk.Label(self.tile_labels["aqi"].master, text="", style="AqiBreakdown.TLabel")
+        self.tile_labels["aqi_breakdown"].pack(anchor="w")
+
+        self.create_saved_locations_panel()
+
+    def create_saved_locations_panel(self):
+        self.saved_frame = ttk.Frame(self, style="Tile.TFrame")
+        self.saved_frame.grid(row=6, column=0, columnspan=2, sticky="ew", pady=(0, 10), padx=5)
+        self.saved_frame.grid_columnconfigure(0, weight=1)
+
+        ttk.Label(self.saved_frame, text="Saved Locations", style="TileLabel.TLabel").grid(row=0, column=0, sticky="w")
+        self.save_location_button = ttk.Button(self.saved_frame, text="Save", command=self.save_current_location, style="Search.TButton")
+        self.save_location_button.grid(row=0, column=1, sticky="e", padx=(0, 5))
+        self.refresh_saved_button = ttk.Button(self.saved_frame, text="Refresh All", command=self.refresh_saved_locations, style="Search.TButton")
+        self.refresh_saved_button.grid(row=0, column=2, sticky="e")
+
+        self.saved_rows_frame = ttk.Frame(self.saved_frame, style="Tile.TFrame", padding=0)
+        self.saved_rows_frame.grid(row=1, column=0, columnspan=3, sticky="ew", pady=(5, 0))
+        self.saved_rows_frame.grid_columnconfigure(0, weight=1)
+        self.saved_rows_frame.grid_columnconfigure(1, weight=1)
+        for location in self.saved_locations:
+            self.add_saved_location_row(location)
+
+    def create_tile(self, parent_frame, label_text, value_text, row, col, columnspan=1):
         tile_frame = ttk.Frame(parent_frame, style="Tile.TFrame")
-        tile_frame.grid(row=row, column=col, sticky="nsew", padx=5, pady=5)
+        tile_frame.grid(row=row, column=col, columnspan=columnspan, sticky="nsew", padx=5, pady=5)
         tile_frame.grid_columnconfigure(0, weight=1)
         label = ttk.Label(tile_frame, text=label_text, style="TileLabel.TLabel")
         label.pack(pady=(0, 2), anchor="w")
@@ -228,26 +315,163 @@ class WeatherUI(tk.Frame):
         value.pack(pady=(0, 0), anchor="w")
         return value
 
+    def add_saved_location_row(self, location):
+        name = location['name']
+        i = len(self.saved_location_labels)
+        label = ttk.Label(self.saved_rows_frame, text=name.split(',')[0], style="DailyTemp.TLabel", cursor="hand2")
+        label.grid(row=i // 2, column=i % 2, sticky="w", padx=5, pady=2)
+        label.bind("<Button-1>", lambda event, name=name: self.select_saved_location(name))
+        self.saved_location_labels[name] = label
+
+    def update_saved_location_row(self, name):
+        label = self.saved_location_labels.get(name)
+        if label is None:
+            return
+        short_name = name.split(',')[0]
+        parsed = self.saved_summaries.get(name)
+        if parsed is None:
+            label.config(text=f"{short_name}  --")
+            return
+        current = parsed['current']
+        unit_symbol = "°C" if self.current_unit == "celsius" else "°F"
+        temp = convert_temperature(current['temp'], self.current_unit)
+        temp_text = f"{temp:.0f}{unit_symbol}" if temp is not None else "--"
+        label.config(text=f"{short_name}  {temp_text}  {current['description']}")
+
+    def save_current_location(self):
+        if self.current_coordinates is None or not self.display_location:
+            return
+        if any(location['name'] == self.display_location for location in self.saved_locations):
+            return
+        lat, lon = self.current_coordinates
+        location = {"name": self.display_location, "latitude": lat, "longitude": lon}
+        self.saved_locations.append(location)
+        save_json(SAVED_LOCATIONS_FILENAME, self.saved_locations)
+        cache = get_geocoding_cache()
+        if cache is not None:
+            cache.put(self.display_location, lat, lon, self.display_location)
+        self.add_saved_location_row(location)
+        if self.parsed_data is not None:
+            self.saved_summaries[self.display_location] = self.parsed_data
+            self.update_saved_location_row(self.display_location)
+
+    def select_saved_location(self, name):
+        location = next((location for location in self.saved_locations if location['name'] == name), None)
+        if location is None:
+            return
+        # The stored coordinates are used as is; display names do not survive
+        # a round trip through the geocoding search.
+        self.cancel_suggestions()
+        self.search_city_var.set(name)
+        self.location_name = name
+        self.resolved_location = (location['latitude'], location['longitude'], name)
+        self.snapshot_saved_at = None
+        self.set_loading_state()
+        self.load_weather_data()
+
+    def refresh_saved_locations(self):
+        if not self.saved_locations:
+            return
+        if self.saved_refresh_future is not None and not self.saved_refresh_future.done():
+            return
+        self.refresh_saved_button.config(state="disabled")
+        self.saved_refresh_future = self.fetch_executor.submit(self._fetch_saved_locations, list(self.saved_locations))
+        if self.saved_poll_job is None:
+            self.saved_poll_job = self.after(RESULT_POLL_INTERVAL_MS, self._poll_saved_results)
+
+    def _fetch_saved_locations(self, locations):
+        coordinates = [(location['latitude'], location['longitude']) for location in locations]
+        try:
+            for index, weather_data, air_quality_data in get_weather_data_batch(coordinates):
+                parsed_data = parse_weather_data(weather_data, air_quality_data) if weather_data else None
+                self.saved_results.put((locations[index]['name'], parsed_data))
+        except Exception as e:
+            print(f"Error refreshing saved locations: {e}")
+
+    def _poll_saved_results(self):
+        self.saved_poll_job = None
+        while True:
+            try:
+                name, parsed_data = self.saved_results.get_nowait()
+            except queue.Empty:
+                break
+            self.saved_summaries[name] = parsed_data
+            self.update_saved_location_row(name)
+        if self.saved_refresh_future is not None and not self.saved_refresh_future.done():
+            self.saved_poll_job = self.after(RESULT_POLL_INTERVAL_MS, self._poll_saved_results)
+        elif not self.saved_results.empty():
+            self.saved_poll_job = self.after(RESULT_POLL_INTERVAL_MS, self._poll_saved_results)
+        else:
+            self.saved_refresh_future = None
+            self.refresh_saved_button.config(state="enabled")
+
+    def create_daily_forecast_cells(self):
+        # Cells are built once and updated in place on every refresh.
+        for i in range(DAILY_FORECAST_DAYS):
+            day_frame = ttk.Frame(self.daily_forecast_container, style="TFrame", padding=5)
+            day_frame.grid(row=0, column=i, sticky="nsew", padx=2, pady=5)
+            self.daily_forecast_container.grid_columnconfigure(i, weight=1)
+            icon_label = ttk.Label(day_frame, background="#FFFFFF")
+            icon_label.pack()
+            day_label = ttk.Label(day_frame, text="--", style="DailyDay.TLabel")
+            day_label.pack()
+            temp_label = ttk.Label(day_frame, text="--/--", style="DailyTemp.TLabel")
+            temp_label.pack()
+            desc_label = ttk.Label(day_frame, text="", style="DailyDesc.TLabel", wraplength=70, justify=tk.CENTER)
+            desc_label.pack()
+            aqi_label = ttk.Label(day_frame, text="", style="DailyAqi.TLabel")
+            aqi_label.pack(pady=(2, 0))
+            self.daily_forecast_cells.append({
+                "frame": day_frame,
+                "icon": icon_label,
+                "day": day_label,
+                "temp": temp_label,
+                "description": desc_label,
+                "aqi": aqi_label
+            })
+
+    def set_widget(self, widget, **options):
+        state = self.widget_state.setdefault(str(widget), {})
+        changed = {k: v for k, v in options.items() if k not in state or state[k] is not v and state[k] != v}
+        if not changed:
+            return
+        widget.config(**changed)
+        if "image" in changed:
+            widget.image = changed["image"]
+        state.update(changed)
+
     def clear_daily_forecast(self):
-        for widget in self.daily_forecast_widgets:
-            widget.destroy()
-        self.daily_forecast_widgets.clear()
+        for cell in self.daily_forecast_cells:
+            self.set_widget(cell["icon"], image=self.get_icon_for_code(None))
+            self.set_widget(cell["day"], text="--")
+            self.set_widget(cell["temp"], text="--/--")
+            self.set_widget(cell["description"], text="")
+            self.set_daily_aqi(cell, None)
+
+    def set_daily_aqi(self, cell, day_aqi):
+        if day_aqi is None or day_aqi['index'] is None:
+            self.set_widget(cell["aqi"], text="", background="#FFFFFF")
+            return
+        _, color = aqi_category(DAILY_AQI_SCHEME, day_aqi['index'])
+        # Light category colours need dark text; the darker ones need white.
+        red, green, blue = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+        foreground = "#333333" if red * 299 + green * 587 + blue * 114 > 128000 else "#FFFFFF"
+        self.set_widget(cell["aqi"], text=f"AQI {day_aqi['index']}", background=color, foreground=foreground)
+
+    def format_aqi_breakdown(self, aqi):
+        # Sub-indices for each pollutant, worst first, so the driver of the
+        # headline number is visible.
+        parts = []
+        for scheme in ("us", "eu"):
+            components = aqi[scheme]['components']
+            if components:
+                ranked = sorted(components.items(), key=lambda item: item[1], reverse=True)
+                parts.append(f"{scheme.upper()}: " + ", ".join(f"{POLLUTANT_LABELS[field]} {value}" for field, value in ranked))
+        return "\n".join(parts)
 
     def set_loading_state(self):
         self.master.config(cursor="watch")
-        self.location_label.config(text="Loading...")
-        self.current_temp_label.config(text="--°")
-        self.description_label.config(text="Fetching weather data...")
-        self.current_weather_icon_label.config(image=self.get_icon_for_code(None))
-        self.current_weather_icon_label.image = self.get_icon_for_code(None)
-        self.clear_daily_forecast()
-        for key in self.tile_labels:
-            self.tile_labels[key].config(text="--")
-        self.search_button.config(state="disabled")
-        self.search_entry.config(state="disabled")
-        self.celsius_radio.config(state="disabled")
-        self.fahrenheit_radio.config(state="disabled")
-        self.update_idletasks()
+        self.set_widget(self.description_label, text="Fetching weather data...")
 
     def reset_ui_state(self):
         self.master.config(cursor="")
@@ -260,109 +484,473 @@ class WeatherUI(tk.Frame):
         selected_unit = self.unit_var.get()
         if self.current_unit != selected_unit:
             self.current_unit = selected_unit
-            self.set_loading_state()
-            self.after(100, self.load_weather_data)
+            # Data is always fetched in Celsius, so switching units only
+            # re-renders, even while a fetch is pending: if that fetch fails the
+            # data on screen must already be in the new unit.
+            if self.parsed_data is not None:
+                self.update_ui(self.parsed_data, self.display_location)
+            for name in self.saved_location_labels:
+                self.update_saved_location_row(name)
+
+    def toggle_history_mode(self):
+        if self.history_mode.get():
+            self.hourly_timeline.grid_remove()
+            self.trend_chart.grid(row=4, column=0, columnspan=2, sticky="ew", pady=(0, 10), padx=5)
+            self.load_history()
+        else:
+            self.trend_chart.grid_remove()
+            self.hourly_timeline.grid()
+
+    def load_history(self):
+        if self.current_coordinates is None:
+            self.trend_chart.set_data(None, None, self.current_unit, message="Loading history...")
+            return
+        if self.history_coordinates == self.current_coordinates and (self.history_summary is not None or self.history_future is not None):
+            self.render_trend()
+            return
+        self.history_generation += 1
+        self.history_summary = None
+        self.history_coordinates = self.current_coordinates
+        self.trend_chart.set_data(None, None, self.current_unit, message="Loading history...")
+        self.history_future = self.fetch_executor.submit(
+            self._fetch_history, self.history_generation, self.current_coordinates)
+        if self.history_poll_job is None:
+            self.history_poll_job = self.after(RESULT_POLL_INTERVAL_MS, self._poll_history_results)
+
+    def _fetch_history(self, generation, coordinates):
+        try:
+            summary = get_history(*coordinates)
+            self.history_results.put((generation, summary, None))
+        except Exception as e:
+            self.history_results.put((generation, None, e))
+
+    def _poll_history_results(self):
+        self.history_poll_job = None
+        while True:
+            try:
+                generation, summary, error = self.history_results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.history_generation:
+                continue
+            self.history_future = None
+            if error is not None:
+                print(f"Error fetching history: {error}")
+                self.history_coordinates = None
+                self.trend_chart.set_data(None, None, self.current_unit, message="History unavailable.")
+                continue
+            self.history_summary = summary
+            self.render_trend()
+        if self.history_future is not None and not self.history_future.done():
+            self.history_poll_job = self.after(RESULT_POLL_INTERVAL_MS, self._poll_history_results)
+        elif not self.history_results.empty():
+            self.history_poll_job = self.after(RESULT_POLL_INTERVAL_MS, self._poll_history_results)
+
+    def render_trend(self):
+        if self.history_summary is None or not self.history_mode.get():
+            return
+        daily = convert_parsed_data(self.parsed_data, self.current_unit)['daily'] if self.parsed_data else None
+        self.trend_chart.set_data(self.history_summary, daily, self.current_unit)
+
+    def on_search_key(self, event):
+        if event.keysym in ("Return", "KP_Enter", "Escape", "Tab"):
+            return
+        if not event.char and event.keysym not in ("BackSpace", "Delete"):
+            return
+        if self.autocomplete_job is not None:
+            self.after_cancel(self.autocomplete_job)
+        self.autocomplete_job = self.after(AUTOCOMPLETE_DEBOUNCE_MS, self.update_suggestions)
+
+    def update_suggestions(self):
+        self.autocomplete_job = None
+        prefix = self.search_city_var.get().strip()
+        # Bumping the generation drops any response still in flight for an
+        # older prefix.
+        self.autocomplete_generation += 1
+        if self.autocomplete_future is not None:
+            self.autocomplete_future.cancel()
+            self.autocomplete_future = None
+        if len(prefix) < AUTOCOMPLETE_MIN_CHARS:
+            self.hide_suggestions()
+            return
+        cache = get_geocoding_cache()
+        local = cache.suggest(prefix, GEOCODING_SEARCH_COUNT) if cache is not None else []
+        self.show_suggestions(local)
+        if (len(local) >= GEOCODING_SEARCH_COUNT or len(prefix) < AUTOCOMPLETE_REMOTE_MIN_CHARS
+                or normalize_city_name(prefix) in self.autocomplete_queried):
+            return
+        self.autocomplete_future = self.autocomplete_executor.submit(
+            self._fetch_suggestions, self.autocomplete_generation, prefix)
+        if self.autocomplete_poll_job is None:
+            self.autocomplete_poll_job = self.after(RESULT_POLL_INTERVAL_MS, self._poll_suggestion_results)
+
+    def _fetch_suggestions(self, generation, prefix):
+        if generation != self.autocomplete_generation:
+            return
+        try:
+            places = search_locations(prefix)
+        except Exception as e:
+            print(f"Error fetching suggestions: {e}")
+            places = None
+        self.autocomplete_results.put((generation, prefix, places))
+
+    def _poll_suggestion_results(self):
+        self.autocomplete_poll_job = None
+        while True:
+            try:
+                generation, prefix, places = self.autocomplete_results.get_nowait()
+            except queue.Empty:
+                break
+            if places is None:
+                continue
+            # Stale responses still landed in the geocoding cache, so the
+            # query is not repeated even though its results are not shown.
+            self.autocomplete_queried.add(normalize_city_name(prefix))
+            if generation != self.autocomplete_generation or prefix != self.search_city_var.get().strip():
+                continue
+            names = [display_name for _, _, display_name in places]
+            cache = get_geocoding_cache()
+            if cache is not None:
+                names += [name for name in cache.suggest(prefix, GEOCODING_SEARCH_COUNT) if name not in names]
+            self.show_suggestions(names[:GEOCODING_SEARCH_COUNT])
+        if self.autocomplete_future is not None and not self.autocomplete_future.done():
+            self.autocomplete_poll_job = self.after(RESULT_POLL_INTERVAL_MS, self._poll_suggestion_results)
+        elif not self.autocomplete_results.empty():
+            self.autocomplete_poll_job = self.after(RESULT_POLL_INTERVAL_MS, self._poll_suggestion_results)
+
+    def show_suggestions(self, names):
+        if not names:
+            self.hide_suggestions()
+            return
+        if names != self.suggestions:
+            self.suggestion_list.delete(0, tk.END)
+            for name in names:
+                self.suggestion_list.insert(tk.END, name)
+            self.suggestion_list.config(height=len(names))
+            self.suggestions = names
+        self.suggestion_list.place(in_=self.search_entry, relx=0, rely=1.0, relwidth=1.0)
+        self.suggestion_list.lift()
+
+    def hide_suggestions(self, event=None):
+        self.suggestion_list.place_forget()
+        self.suggestions = []
+        if event is not None and event.widget is self.suggestion_list:
+            self.search_entry.focus_set()
+
+    def focus_suggestions(self, event=None):
+        if self.suggestions:
+            self.suggestion_list.focus_set()
+            self.suggestion_list.selection_clear(0, tk.END)
+            self.suggestion_list.selection_set(0)
+            self.suggestion_list.activate(0)
+        return "break"
+
+    def choose_suggestion(self, event=None):
+        selection = self.suggestion_list.curselection()
+        if not selection:
+            return
+        self.search_city_var.set(self.suggestion_list.get(selection[0]))
+        self.search_entry.focus_set()
+        self.search_entry.icursor(tk.END)
+        self.perform_search()
+
+    def cancel_suggestions(self):
+        if self.autocomplete_job is not None:
+            self.after_cancel(self.autocomplete_job)
+            self.autocomplete_job = None
+        self.autocomplete_generation += 1
+        self.hide_suggestions()
 
     def perform_search(self, event=None):
+        self.cancel_suggestions()
         search_term = self.search_city_var.get().strip()
         if search_term:
             self.location_name = search_term
+            self.resolved_location = None
+            self.snapshot_saved_at = None
             self.set_loading_state()
-            self.after(100, self.load_weather_data)
+            self.load_weather_data()
         else:
-            self.description_label.config(text="Please enter a city name.")
+            self.set_widget(self.description_label, text="Please enter a city name.")
             self.reset_ui_state()
 
-    def load_weather_data(self):
+    def load_weather_data(self, force=False):
+        if self.pending_future is not None and not self.pending_future.done():
+            # Timer and manual refreshes of the same location share one fetch.
+            if self.pending_location == self.location_name:
+                return
+            self.pending_future.cancel()
+        self.fetch_generation += 1
+        self.pending_location = self.location_name
+        self.pending_forced = force
+        self.pending_future = self.fetch_executor.submit(
+            self._fetch_weather, self.fetch_generation, self.location_name, force, self.resolved_location)
+        if self.poll_job is None:
+            self.poll_job = self.after(RESULT_POLL_INTERVAL_MS, self._poll_fetch_results)
+
+    def scheduled_refresh(self):
+        # The timer only fires once the cached forecast is stale, so it fetches
+        # past the cache and the scheduler backs off on the real result.
+        self.load_weather_data(force=True)
+        self.refresh_saved_locations()
+
+    def is_current_data_fresh(self):
+        if self.current_coordinates is None:
+            return False
+        lat, lon = self.current_coordinates
+        return is_weather_data_fresh(lat, lon)
+
+    def _fetch_weather(self, generation, location_name, force=False, resolved_location=None):
         try:
-            lat, lon, display_location = get_coordinates(self.location_name)
-            if lat and lon:
-                weather_data, air_quality_data = get_weather_data(lat, lon, timezone="auto", temperature_unit=self.current_unit)
-                if weather_data and air_quality_data:
-                    parsed_data = parse_weather_data(weather_data, air_quality_data)
-                    self.update_ui(parsed_data, display_location)
-                else:
-                    self.description_label.config(text="Could not fetch weather data. API issue or no data.")
-                    self.current_temp_label.config(text="--°")
-                    self.current_weather_icon_label.config(image=self.get_icon_for_code(None))
-                    self.current_weather_icon_label.image = self.get_icon_for_code(None)
-                    self.clear_daily_forecast()
-                    for key in self.tile_labels:
-                        self.tile_labels[key].config(text="--")
+            if resolved_location is not None:
+                lat, lon, display_location = resolved_location
+            else:
+                lat, lon, display_location = get_coordinates(location_name)
+            if generation != self.fetch_generation:
+                return
+            if lat is None or lon is None:
+                self.fetch_results.put((generation, "not_found", None, None, None))
+                return
+            weather_data, air_quality_data = get_weather_data(
+                lat, lon, timezone="auto", force=force,
+                on_current=lambda current: self.fetch_results.put((generation, "current", current, display_location, None)))
+            if generation != self.fetch_generation:
+                return
+            if weather_data and air_quality_data:
+                parsed_data = parse_weather_data(weather_data, air_quality_data)
+                self.fetch_results.put((generation, "ok", parsed_data, display_location, (lat, lon)))
+                if self.snapshot_store is not None:
+                    self.snapshot_store.save(location_name, display_location, (lat, lon), parsed_data)
             else:
-                self.location_label.config(text=f"Location not found.")
-                self.description_label.config(text="Please check location name or try another.")
-                self.current_temp_label.config(text="--°")
-                self.current_weather_icon_label.config(image=self.get_icon_for_code(None))
-                self.current_weather_icon_label.image = self.get_icon_for_code(None)
-                self.clear_daily_forecast()
-                for key in self.tile_labels:
-                    self.tile_labels[key].config(text="--")
+                self.fetch_results.put((generation, "no_data", None, None, None))
         except Exception as e:
-            self.description_label.config(text=f"An error occurred: {e}")
-            self.current_temp_label.config(text="--°")
-            self.current_weather_icon_label.config(image=self.get_icon_for_code(None))
-            self.current_weather_icon_label.image = self.get_icon_for_code(None)
-            self.clear_daily_forecast()
-            for key in self.tile_labels:
-                self.tile_labels[key].config(text="--")
+            self.fetch_results.put((generation, "error", e, None, None))
+
+    def _poll_fetch_results(self):
+        self.poll_job = None
+        latest = None
+        preview = None
+        while True:
+            try:
+                result = self.fetch_results.get_nowait()
+            except queue.Empty:
+                break
+            if result[0] != self.fetch_generation:
+                continue
+            if result[1] == "current":
+                preview = result
+            else:
+                latest = result
+        if latest is not None:
+            self._apply_fetch_result(*latest)
+            return
+        if preview is not None:
+            self.show_current_preview(preview[2], preview[3])
+        if self.pending_future is not None and not self.pending_future.done():
+            self.poll_job = self.after(RESULT_POLL_INTERVAL_MS, self._poll_fetch_results)
+        elif not self.fetch_results.empty():
+            self.poll_job = self.after(RESULT_POLL_INTERVAL_MS, self._poll_fetch_results)
+
+    def show_current_preview(self, current, display_location):
+        # The current conditions arrive before the hourly and daily series
+        # finish streaming, so the header can be drawn first.
+        unit_symbol = "°C" if self.current_unit == "celsius" else "°F"
+        temp = convert_temperature(current.get('temperature_2m'), self.current_unit)
+        self.set_widget(self.location_label, text=display_location.split(',')[0].strip())
+        self.set_widget(self.current_temp_label, text=f"{temp:.0f}{unit_symbol}" if temp is not None else "--°")
+        self.set_widget(self.description_label, text=get_weather_description(current.get('weather_code')).capitalize())
+        self.set_widget(self.current_weather_icon_label, image=self.get_icon_for_code(current.get('weather_code'), "header", current.get('is_day')))
+
+    def _apply_fetch_result(self, generation, status, payload, display_location, coordinates):
+        self.pending_future = None
+        forced = self.pending_forced
+        self.pending_forced = False
+        if status in ("ok", "not_found"):
+            self.refresh_scheduler.on_success()
+        else:
+            self.refresh_scheduler.on_failure()
+        try:
+            if status == "ok":
+                self.parsed_data = payload
+                self.display_location = display_location
+                self.current_coordinates = coordinates
+                self.snapshot_saved_at = None
+                self.update_ui(payload, display_location)
+            elif self.snapshot_saved_at is not None:
+                # Keep showing the saved snapshot when the startup refresh fails.
+                age = format_age(time.time() - self.snapshot_saved_at)
+                description = self.parsed_data['current']['description'].capitalize()
+                self.set_widget(self.description_label, text=f"{description} (saved {age}, offline)")
+            elif forced and status != "not_found" and self.parsed_data is not None:
+                # A failed timed refresh leaves the last forecast on screen
+                # while the scheduler backs off and retries.
+                description = self.parsed_data['current']['description'].capitalize()
+                self.set_widget(self.description_label, text=f"{description} (update failed, retrying)")
+            elif status == "not_found":
+                self.set_widget(self.location_label, text=f"Location not found.")
+                self.show_error_state("Please check location name or try another.")
+            elif status == "no_data":
+                self.show_error_state("Could not fetch weather data. API issue or no data.")
+            else:
+                self.show_error_state(f"An error occurred: {payload}")
+        except Exception as e:
+            self.show_error_state(f"An error occurred: {e}")
         finally:
             self.reset_ui_state()
 
+    def show_snapshot(self, snapshot):
+        self.parsed_data = snapshot["parsed_data"]
+        self.display_location = snapshot["display_location"]
+        self.current_coordinates = tuple(snapshot["coordinates"]) if snapshot["coordinates"] else None
+        self.snapshot_saved_at = snapshot["saved_at"]
+        self.update_ui(self.parsed_data, self.display_location)
+        age = format_age(time.time() - snapshot["saved_at"])
+        description = self.parsed_data['current']['description'].capitalize()
+        self.set_widget(self.description_label, text=f"{description} (saved {age}, updating...)")
+
+    def show_error_state(self, message):
+        self.set_widget(self.description_label, text=message)
+        self.set_widget(self.current_temp_label, text="--°")
+        self.set_widget(self.current_weather_icon_label, image=self.get_icon_for_code(None, "header"))
+        self.clear_daily_forecast()
+        self.hourly_timeline.set_data(None, self.current_unit)
+        for key in self.tile_labels:
+            self.set_widget(self.tile_labels[key], text="--")
+
+    def toggle_debug_overlay(self, event=None):
+        if self.debug_overlay is not None:
+            if self.debug_overlay_job is not None:
+                self.after_cancel(self.debug_overlay_job)
+                self.debug_overlay_job = None
+            self.debug_overlay.destroy()
+            self.debug_overlay = None
+            # Metrics switched on from the environment stay on after the overlay closes.
+            if self.debug_overlay_enabled_metrics:
+                metrics.disable()
+                self.debug_overlay_enabled_metrics = False
+            return
+        self.debug_overlay_enabled_metrics = not metrics.is_enabled()
+        metrics.enable()
+        self.debug_overlay = tk.Label(self, justify=tk.LEFT, anchor="nw", font=("Courier", 9),
+                                      background="#222222", foreground="#E0E0E0", padx=6, pady=4)
+        self.debug_overlay.place(relx=1.0, rely=0.0, anchor="ne")
+        self.refresh_debug_overlay()
+
+    def refresh_debug_overlay(self):
+        self.debug_overlay_job = None
+        if self.debug_overlay is None:
+            return
+        self.debug_overlay.config(text=metrics.format_overlay())
+        self.debug_overlay.lift()
+        self.debug_overlay_job = self.after(DEBUG_OVERLAY_REFRESH_MS, self.refresh_debug_overlay)
+
+    def destroy(self):
+        self.fetch_generation += 1
+        self.refresh_scheduler.stop()
+        if self.debug_overlay_job is not None:
+            self.after_cancel(self.debug_overlay_job)
+            self.debug_overlay_job = None
+        if self.poll_job is not None:
+            self.after_cancel(self.poll_job)
+            self.poll_job = None
+        if self.saved_poll_job is not None:
+            self.after_cancel(self.saved_poll_job)
+            self.saved_poll_job = None
+        self.cancel_suggestions()
+        if self.autocomplete_poll_job is not None:
+            self.after_cancel(self.autocomplete_poll_job)
+            self.autocomplete_poll_job = None
+        if self.history_poll_job is not None:
+            self.after_cancel(self.history_poll_job)
+            self.history_poll_job = None
+        self.fetch_executor.shutdown(wait=False, cancel_futures=True)
+        self.autocomplete_executor.shutdown(wait=False, cancel_futures=True)
+        super().destroy()
+
     def update_ui(self, parsed_data, display_location):
+        render_start = time.perf_counter()
+        parsed_data = convert_parsed_data(parsed_data, self.current_unit)
         current = parsed_data['current']
         daily = parsed_data['daily']
         air_quality = parsed_data['air_quality']
+        aqi = parsed_data.get('aqi')
+        daily_aqi = aqi[DAILY_AQI_SCHEME]['daily'] if aqi else []
 
         unit_symbol = "°C" if self.current_unit == "celsius" else "°F"
 
-        self.location_label.config(text=display_location.split(',')[0].strip())
-        self.current_temp_label.config(text=f"{current['temp']:.0f}{unit_symbol}")
-        self.description_label.config(text=current['description'].capitalize())
-
-        current_weather_code = current.get('weather_code')
-        current_icon = self.get_icon_for_code(current_weather_code)
-        self.current_weather_icon_label.config(image=current_icon)
-        self.current_weather_icon_label.image = current_icon
-
-        self.clear_daily_forecast()
-        self.daily_forecast_container.grid_columnconfigure("all", weight=0)
-
-        for i, day in enumerate(daily[:7]):
-            day_frame = ttk.Frame(self.daily_forecast_container, style="TFrame", padding=5)
-            day_frame.grid(row=0, column=i, sticky="nsew", padx=2, pady=5)
-            self.daily_forecast_container.grid_columnconfigure(i, weight=1)
-            
-            day_name = day['dt'].strftime('%a')
+        self.set_widget(self.location_label, text=display_location.split(',')[0].strip())
+        self.set_widget(self.current_temp_label, text=f"{current['temp']:.0f}{unit_symbol}" if current['temp'] is not None else "--°")
+        self.set_widget(self.description_label, text=current['description'].capitalize())
+        self.set_widget(self.current_weather_icon_label, image=self.get_icon_for_code(current.get('weather_code'), "header", current.get('is_day')))
+
+        for i, cell in enumerate(self.daily_forecast_cells):
+            if i >= len(daily):
+                self.set_widget(cell["icon"], image=self.get_icon_for_code(None))
+                self.set_widget(cell["day"], text="--")
+                self.set_widget(cell["temp"], text="--/--")
+                self.set_widget(cell["description"], text="")
+                self.set_daily_aqi(cell, None)
+                continue
+            day = daily[i]
             temp_max = f"{day['temp_max']:.0f}" if day['temp_max'] is not None else "--"
             temp_min = f"{day['temp_min']:.0f}" if day['temp_min'] is not None else "--"
-            description = day['description']
-            
-            daily_weather_code = day.get('weather_code')
-            daily_icon = self.get_icon_for_code(daily_weather_code)
-            
-            icon_label = ttk.Label(day_frame, image=daily_icon, background="#FFFFFF")
-            icon_label.image = daily_icon
-            icon_label.pack()
-
-            ttk.Label(day_frame, text=day_name, style="DailyDay.TLabel").pack()
-            ttk.Label(day_frame, text=f"{temp_max}{unit_symbol}/{temp_min}{unit_symbol}", style="DailyTemp.TLabel").pack()
-            ttk.Label(day_frame, text=description, style="DailyDesc.TLabel", wraplength=70, justify=tk.CENTER).pack()
-            
-            self.daily_forecast_widgets.append(day_frame)
-
-        self.tile_labels["rain_rate"].config(text=f"{current['rain_rate']:.1f} mm" if current['rain_rate'] is not None else "0.0 mm")
-        self.tile_labels["humidity"].config(text=f"{current['humidity']:.0f}%" if current['humidity'] is not None else "--%")
-        self.tile_labels["current_temp_tile"].config(text=f"{current['feels_like']:.0f}{unit_symbol}" if current['feels_like'] is not None else "--°")
-        self.tile_labels["uv_index"].config(text=f"{current['uvi']:.1f}" if current['uvi'] is not None else "--")
+            self.set_widget(cell["icon"], image=self.get_icon_for_code(day.get('weather_code')))
+            self.set_widget(cell["day"], text=day['dt'].strftime('%a'))
+            self.set_widget(cell["temp"], text=f"{temp_max}{unit_symbol}/{temp_min}{unit_symbol}")
+            self.set_widget(cell["description"], text=day['description'])
+            self.set_daily_aqi(cell, daily_aqi[i] if i < len(daily_aqi) else None)
+
+        self.hourly_timeline.set_data(parsed_data.get('hourly'), self.current_unit, parsed_data.get('hourly_index'))
+        if self.history_mode.get():
+            if self.current_coordinates != self.history_coordinates:
+                self.load_history()
+            elif self.history_summary is not None:
+                self.trend_chart.set_data(self.history_summary, daily, self.current_unit)
+
+        self.set_widget(self.tile_labels["rain_rate"], text=f"{current['rain_rate']:.1f} mm" if current['rain_rate'] is not None else "0.0 mm")
+        self.set_widget(self.tile_labels["humidity"], text=f"{current['humidity']:.0f}%" if current['humidity'] is not None else "--%")
+        self.set_widget(self.tile_labels["current_temp_tile"], text=f"{current['feels_like']:.0f}{unit_symbol}" if current['feels_like'] is not None else "--°")
+        self.set_widget(self.tile_labels["uv_index"], text=f"{current['uvi']:.1f}" if current['uvi'] is not None else "--")
 
         if air_quality and air_quality.get('pm2_5') is not None:
-            self.tile_labels["air_quality"].config(text=f"{air_quality['pm2_5']:.1f} µg/m³")
+            self.set_widget(self.tile_labels["air_quality"], text=f"{air_quality['pm2_5']:.1f} µg/m³")
+        else:
+            self.set_widget(self.tile_labels["air_quality"], text="N/A")
+
+        if aqi and (aqi['us']['current'] is not None or aqi['eu']['current'] is not None):
+            summary = []
+            for scheme in ("us", "eu"):
+                value = aqi[scheme]['current']
+                if value is not None:
+                    summary.append(f"{value} {aqi_category(scheme, value)[0]}")
+                else:
+                    summary.append("--")
+            self.set_widget(self.tile_labels["aqi"], text=" / ".join(summary))
+            self.set_widget(self.tile_labels["aqi_breakdown"], text=self.format_aqi_breakdown(aqi))
         else:
-            self.tile_labels["air_quality"].config(text="N/A")
+            self.set_widget(self.tile_labels["aqi"], text="N/A")
+            self.set_widget(self.tile_labels["aqi_breakdown"], text="")
 
         sunrise_time = current['sunrise'].strftime('%I:%M %p') if current['sunrise'] else "--:-- AM"
         sunset_time = current['sunset'].strftime('%I:%M %p') if current['sunset'] else "--:-- PM"
-        self.tile_labels["sunrise"].config(text=sunrise_time)
-        self.tile_labels["sunset"].config(text=sunset_time)
-        self.tile_labels["wind_speed"].config(text=f"{current.get('wind_speed', '--'):.1f} km/h")
\ No newline at end of file
+        self.set_widget(self.tile_labels["sunrise"], text=sunrise_time)
+        self.set_widget(self.tile_labels["sunset"], text=sunset_time)
+        self.set_widget(self.tile_labels["wind_speed"], text=f"{current['wind_speed']:.1f} km/h" if current.get('wind_speed') is not None else "-- km/h")
+
+        self.record_render_time(time.perf_counter() - render_start)
+
+    def record_render_time(self, seconds):
+        self.render_times.append(seconds)
+        metrics.observe("update_ui", seconds)
+        if self.report_render_times:
+            print(f"update_ui: {seconds * 1000:.2f} ms (avg {self.get_render_stats()['avg_ms']:.2f} ms over {len(self.render_times)})")
+
+    def get_render_stats(self):
+        if not self.render_times:
+            return {"count": 0, "last_ms": None, "avg_ms": None, "max_ms": None}
+        return {
+            "count": len(self.render_times),
+            "last_ms": self.render_times[-1] * 1000,
+            "avg_ms": sum(self.render_times) / len(self.render_times) * 1000,
+            "max_ms": max(self.render_times) * 1000
+        }
@@ -1,11 +1,127 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import datetime
+import os
+import threading
+import time
+from geocache import get_geocoding_cache, format_display_name
+from response_cache import get_response_cache, make_cache_key
+from timeseries import TimeSeries
+from aqi import compute_aqi
+from weather_codes import get_weather_description, get_severity
+from history import get_history_store, make_location_key, HISTORY_HOURLY_FIELDS
+from streaming import decode_forecast_stream, iter_text_chunks
+import metrics
 
-OPEN_METEO_BASE_URL = "https://api.open-meteo.com/v1/forecast"
-OPEN_METEO_AIR_QUALITY_URL = "https://air-quality-api.open-meteo.com/v1/air-quality"
-GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+OPEN_METEO_BASE_URL = os.environ.get("WEATHER_APP_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+OPEN_METEO_AIR_QUALITY_URL = os.environ.get("WEATHER_APP_AIR_QUALITY_URL", "https://air-quality-api.open-meteo.com/v1/air-quality")
+OPEN_METEO_ARCHIVE_URL = os.environ.get("WEATHER_APP_ARCHIVE_URL", "https://archive-api.open-meteo.com/v1/archive")
+GEOCODING_URL = os.environ.get("WEATHER_APP_GEOCODING_URL", "https://geocoding-api.open-meteo.com/v1/search")
+
+FORECAST_CURRENT_FIELDS = "temperature_2m,relative_humidity_2m,apparent_temperature,is_day,precipitation,rain,showers,snowfall,weather_code,cloud_cover,pressure_msl,surface_pressure,wind_speed_10m,wind_direction_10m,wind_gusts_10m"
+FORECAST_HOURLY_FIELDS = "temperature_2m,apparent_temperature,precipitation_probability,precipitation,rain,showers,snowfall,weather_code,cloud_cover,wind_speed_10m,wind_direction_10m,wind_gusts_10m,uv_index"
+FORECAST_DAILY_FIELDS = "weather_code,temperature_2m_max,temperature_2m_min,apparent_temperature_max,apparent_temperature_min,sunrise,sunset,uv_index_max,precipitation_sum,precipitation_hours,precipitation_probability_max,wind_speed_10m_max,wind_gusts_10m_max"
+FORECAST_SECTIONS = ("current", "hourly", "daily")
+AIR_QUALITY_HOURLY_FIELDS = "pm10,pm2_5,carbon_monoxide,nitrogen_dioxide,sulphur_dioxide,ozone"
+AIR_QUALITY_PAST_DAYS = 1
+GEOCODING_SEARCH_COUNT = 8
+HISTORY_DAYS = 30
+# The forecast endpoint serves recent past days; older ranges come from the
+# reanalysis archive.
+FORECAST_MAX_PAST_DAYS = 92
+BATCH_CHUNK_SIZE = 50
+
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 15
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_POOL_SIZE = 10
+
+_session = None
+_session_lock = threading.Lock()
+_request_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="open-meteo")
+
+def configure_http(connect_timeout=None, read_timeout=None, retries=None, backoff_factor=None, pool_size=None):
+    global HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_RETRIES, HTTP_BACKOFF_FACTOR, HTTP_POOL_SIZE, _session
+    if connect_timeout is not None:
+        HTTP_CONNECT_TIMEOUT = connect_timeout
+    if read_timeout is not None:
+        HTTP_READ_TIMEOUT = read_timeout
+    if retries is not None:
+        HTTP_RETRIES = retries
+    if backoff_factor is not None:
+        HTTP_BACKOFF_FACTOR = backoff_factor
+    if pool_size is not None:
+        HTTP_POOL_SIZE = pool_size
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+class CountingRetry(Retry):
+    def increment(self, *args, **kwargs):
+        metrics.incr("http_retries")
+        return super().increment(*args, **kwargs)
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = CountingRetry(
+                total=HTTP_RETRIES,
+                backoff_factor=HTTP_BACKOFF_FACTOR,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",)
+            )
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+def _get_json(url, params, span_name="http_get"):
+    with metrics.span(span_name):
+        response = get_session().get(url, params=params, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+        response.raise_for_status()
+    with metrics.span("json_decode"):
+        return response.json()
+
+def _get_streamed(url, params, hourly_fields, on_current=None, span_name="http_get"):
+    # Hourly columns are decoded straight into float arrays and any hourly
+    # field that was not requested is skipped without being parsed.
+    with metrics.span(span_name):
+        with get_session().get(url, params=params, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT), stream=True) as response:
+            response.raise_for_status()
+            # Decoding overlaps the transfer, so the time spent waiting for
+            # chunks is subtracted to report json_decode on its own.
+            waited = [0.0]
+            start = time.perf_counter()
+            data = decode_forecast_stream(_timed_chunks(iter_text_chunks(response), waited),
+                                          set(hourly_fields.split(",")), on_current=on_current)
+            metrics.observe("json_decode", time.perf_counter() - start - waited[0])
+            return data
+
+def _timed_chunks(chunks, waited):
+    chunks = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        chunk = next(chunks, None)
+        waited[0] += time.perf_counter() - start
+        if chunk is None:
+            return
+        yield chunk
 
 def get_coordinates(city_name):
+    cache = get_geocoding_cache()
+    if cache is not None:
+        cached = cache.get(city_name)
+        if cached is not None:
+            metrics.incr("geocoding_cache_hits")
+            return cached
+        metrics.incr("geocoding_cache_misses")
     params = {
         "name": city_name,
         "count": 1,
@@ -13,123 +129,310 @@ def get_coordinates(city_name):
         "format": "json"
     }
     try:
-        response = requests.get(GEOCODING_URL, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = _get_json(GEOCODING_URL, params, span_name="geocoding")
         if data and data.get('results'):
             result = data['results'][0]
-            display_name = result.get('name')
-            if result.get('admin1'):
-                display_name += f", {result['admin1']}"
-            if result.get('country'):
-                display_name += f", {result['country']}"
+            display_name = format_display_name(result)
+            if cache is not None:
+                cache.put(city_name, result['latitude'], result['longitude'], display_name)
             return result['latitude'], result['longitude'], display_name
         return None, None, None
     except requests.exceptions.RequestException as e:
         print(f"Error fetching coordinates: {e}")
         return None, None, None
 
-def get_weather_data(lat, lon, timezone="auto", daily_forecast_days=7, temperature_unit="celsius"):
-    weather_params = {
+def search_locations(query, count=GEOCODING_SEARCH_COUNT):
+    params = {
+        "name": query,
+        "count": count,
+        "language": "en",
+        "format": "json"
+    }
+    data = _get_json(GEOCODING_URL, params, span_name="geocoding_search")
+    places = []
+    for result in (data or {}).get('results') or []:
+        places.append((result['latitude'], result['longitude'], format_display_name(result)))
+    cache = get_geocoding_cache()
+    if cache is not None and places:
+        # Candidates are stored under their display names, so picking one
+        # resolves from the cache to exactly that place.
+        cache.put_many([(display_name, lat, lon, display_name) for lat, lon, display_name in places])
+    return places
+
+CANONICAL_TEMPERATURE_UNIT = "celsius"
+
+def get_weather_data(lat, lon, timezone="auto", daily_forecast_days=7, use_cache=True, on_current=None, force=False):
+    cache = get_response_cache() if use_cache else None
+    if cache is None:
+        try:
+            return _fetch_weather_data(lat, lon, timezone, daily_forecast_days, on_current)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Error fetching weather data: {e}")
+            return None, None
+
+    key = make_cache_key(lat, lon, timezone, daily_forecast_days)
+    # A forced fetch skips the cached copy, so a timed refresh gets the new
+    # forecast or the real failure rather than a stale payload, and still
+    # stores what it fetched.
+    cached = None if force else cache.get(key)
+    if cached is not None and not is_complete_forecast(cached[0][0]):
+        cached = None
+    if cached is not None:
+        (weather_data, air_quality_data), fresh = cached
+        metrics.incr("response_cache_hits" if fresh else "response_cache_stale_hits")
+        if not fresh:
+            cache.revalidate(key, lambda: _fetch_weather_data(lat, lon, timezone, daily_forecast_days))
+        return weather_data, air_quality_data
+    metrics.incr("response_cache_bypasses" if force else "response_cache_misses")
+    try:
+        weather_data, air_quality_data = _fetch_weather_data(lat, lon, timezone, daily_forecast_days, on_current)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"Error fetching weather data: {e}")
+        return None, None
+    cache.put(key, [weather_data, air_quality_data])
+    return weather_data, air_quality_data
+
+def is_weather_data_fresh(lat, lon, timezone="auto", daily_forecast_days=7):
+    cache = get_response_cache()
+    return cache is not None and cache.is_fresh(make_cache_key(lat, lon, timezone, daily_forecast_days))
+
+def _join_coordinates(values):
+    return ",".join(str(v) for v in values)
+
+def _forecast_params(lat, lon, timezone, daily_forecast_days):
+    return {
         "latitude": lat,
         "longitude": lon,
-        "current": "temperature_2m,relative_humidity_2m,apparent_temperature,is_day,precipitation,rain,showers,snowfall,weather_code,cloud_cover,pressure_msl,surface_pressure,wind_speed_10m,wind_direction_10m,wind_gusts_10m",
-        "hourly": "temperature_2m,apparent_temperature,precipitation_probability,precipitation,rain,showers,snowfall,weather_code,cloud_cover,wind_speed_10m,wind_direction_10m,wind_gusts_10m,uv_index",
-        "daily": "weather_code,temperature_2m_max,temperature_2m_min,apparent_temperature_max,apparent_temperature_min,sunrise,sunset,uv_index_max,precipitation_sum,precipitation_hours,precipitation_probability_max,wind_speed_10m_max,wind_gusts_10m_max",
+        "current": FORECAST_CURRENT_FIELDS,
+        "hourly": FORECAST_HOURLY_FIELDS,
+        "daily": FORECAST_DAILY_FIELDS,
         "timezone": timezone,
         "forecast_days": daily_forecast_days + 1,
-        "temperature_unit": temperature_unit
+        "temperature_unit": CANONICAL_TEMPERATURE_UNIT
     }
-    air_quality_params = {
+
+def _air_quality_params(lat, lon, timezone):
+    return {
         "latitude": lat,
         "longitude": lon,
-        "hourly": "pm10,pm2_5,carbon_monoxide,nitrogen_dioxide,sulphur_dioxide,ozone",
-        "timezone": timezone
+        "hourly": AIR_QUALITY_HOURLY_FIELDS,
+        "timezone": timezone,
+        # The previous day fills the 8 and 24 hour AQI windows at midnight.
+        "past_days": AIR_QUALITY_PAST_DAYS
     }
+
+def is_complete_forecast(weather_data):
+    return isinstance(weather_data, dict) and all(weather_data.get(key) for key in FORECAST_SECTIONS)
+
+def _fetch_weather_data(lat, lon, timezone, daily_forecast_days, on_current=None):
+    weather_future = _request_executor.submit(_get_streamed, OPEN_METEO_BASE_URL, _forecast_params(lat, lon, timezone, daily_forecast_days), FORECAST_HOURLY_FIELDS, on_current, "forecast_fetch")
+    air_quality_future = _request_executor.submit(_get_streamed, OPEN_METEO_AIR_QUALITY_URL, _air_quality_params(lat, lon, timezone), AIR_QUALITY_HOURLY_FIELDS, None, "air_quality_fetch")
+    weather_data, air_quality_data = weather_future.result(), air_quality_future.result()
+    # Raising keeps an incomplete payload out of the cache on both the normal
+    # and the background revalidation path.
+    if not is_complete_forecast(weather_data):
+        raise ValueError("Forecast response is missing current, hourly or daily data")
+    return weather_data, air_quality_data
+
+def _fetch_weather_chunk(chunk, timezone, daily_forecast_days):
+    lats = _join_coordinates(lat for _, lat, _ in chunk)
+    lons = _join_coordinates(lon for _, _, lon in chunk)
+    weather_future = _request_executor.submit(_get_json, OPEN_METEO_BASE_URL, _forecast_params(lats, lons, timezone, daily_forecast_days), "forecast_fetch")
+    air_quality_future = _request_executor.submit(_get_json, OPEN_METEO_AIR_QUALITY_URL, _air_quality_params(lats, lons, timezone), "air_quality_fetch")
+    weather_list = weather_future.result()
+    air_quality_list = air_quality_future.result()
+    # A single location comes back as an object, several as a list in request order.
+    if isinstance(weather_list, dict):
+        weather_list = [weather_list]
+    if isinstance(air_quality_list, dict):
+        air_quality_list = [air_quality_list]
+    return [
+        (index, weather_data, air_quality_data)
+        for (index, _, _), weather_data, air_quality_data in zip(chunk, weather_list, air_quality_list)
+    ]
+
+def get_weather_data_batch(coordinates, timezone="auto", daily_forecast_days=7, chunk_size=BATCH_CHUNK_SIZE, use_cache=True):
+    cache = get_response_cache() if use_cache else None
+    pending = []
+    for index, (lat, lon) in enumerate(coordinates):
+        if cache is not None:
+            cached = cache.get(make_cache_key(lat, lon, timezone, daily_forecast_days))
+            if cached is not None and cached[1]:
+                metrics.incr("response_cache_hits")
+                weather_data, air_quality_data = cached[0]
+                yield index, weather_data, air_quality_data
+                continue
+        pending.append((index, lat, lon))
+
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    batch_executor = ThreadPoolExecutor(max_workers=min(len(chunks), 4) or 1, thread_name_prefix="open-meteo-batch")
     try:
-        weather_response = requests.get(OPEN_METEO_BASE_URL, params=weather_params)
-        weather_response.raise_for_status()
-        weather_data = weather_response.json()
-        air_quality_response = requests.get(OPEN_METEO_AIR_QUALITY_URL, params=air_quality_params)
-        air_quality_response.raise_for_status()
-        air_quality_data = air_quality_response.json()
-        return weather_data, air_quality_data
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching weather data: {e}")
-        return None, None
+        futures = {batch_executor.submit(_fetch_weather_chunk, chunk, timezone, daily_forecast_days): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching batch weather data: {e}")
+                for index, _, _ in futures[future]:
+                    yield index, None, None
+                continue
+            for index, weather_data, air_quality_data in results:
+                if not is_complete_forecast(weather_data):
+                    yield index, None, None
+                    continue
+                if cache is not None:
+                    lat, lon = coordinates[index]
+                    cache.put(make_cache_key(lat, lon, timezone, daily_forecast_days), [weather_data, air_quality_data])
+                yield index, weather_data, air_quality_data
+    finally:
+        batch_executor.shutdown(wait=False, cancel_futures=True)
 
-def get_weather_description(weather_code):
-    descriptions = {
-        0: "Clear sky", 1: "Mainly clear", 2: "Partly cloudy", 3: "Overcast",
-        45: "Fog", 48: "Depositing rime fog", 51: "Drizzle: Light",
-        53: "Drizzle: Moderate", 55: "Drizzle: Dense intensity",
-        56: "Freezing Drizzle: Light", 57: "Freezing Drizzle: Dense intensity",
-        61: "Rain: Slight", 63: "Rain: Moderate", 65: "Rain: Heavy intensity",
-        66: "Freezing Rain: Light", 67: "Freezing Rain: Heavy intensity",
-        71: "Snow fall: Slight", 73: "Snow fall: Moderate",
-        75: "Snow fall: Heavy intensity", 77: "Snow grains",
-        80: "Rain showers: Slight", 81: "Rain showers: Moderate",
-        82: "Rain showers: Violent", 85: "Snow showers: Slight",
-        86: "Snow showers: Heavy", 95: "Thunderstorm: Slight or moderate",
-        96: "Thunderstorm with slight hail", 99: "Thunderstorm with heavy hail"
+def _history_params(lat, lon, timezone, start_date, end_date):
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "hourly": ",".join(HISTORY_HOURLY_FIELDS),
+        "timezone": timezone,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "temperature_unit": CANONICAL_TEMPERATURE_UNIT
     }
-    return descriptions.get(weather_code, "Unknown weather")
+
+def _fetch_history(lat, lon, timezone, start_date, end_date):
+    oldest_recent = datetime.date.today() - datetime.timedelta(days=FORECAST_MAX_PAST_DAYS)
+    ranges = []
+    if start_date < oldest_recent:
+        ranges.append((OPEN_METEO_ARCHIVE_URL, start_date, min(end_date, oldest_recent - datetime.timedelta(days=1))))
+    if end_date >= oldest_recent:
+        ranges.append((OPEN_METEO_BASE_URL, max(start_date, oldest_recent), end_date))
+    for url, range_start, range_end in ranges:
+        data = _get_json(url, _history_params(lat, lon, timezone, range_start, range_end), span_name="history_fetch")
+        if data and data.get('hourly'):
+            yield data['hourly']
+
+def get_history(lat, lon, timezone="auto", days=HISTORY_DAYS):
+    # Past days are fetched once into the local history store; later calls
+    # only request the days it does not have yet.
+    store = get_history_store()
+    if store is None:
+        return None
+    location = make_location_key(lat, lon, timezone)
+    end_date = datetime.date.today() - datetime.timedelta(days=1)
+    start_date = end_date - datetime.timedelta(days=days - 1)
+    for range_start, range_end in store.missing_ranges(location, start_date, end_date):
+        for hourly in _fetch_history(lat, lon, timezone, range_start, range_end):
+            rows = store.append(location, hourly)
+            metrics.incr("history_rows_fetched", rows)
+    with metrics.span("history_query"):
+        return store.daily_summary(location, start_date, end_date)
+
+AIR_QUALITY_FIELDS = {
+    "pm10": "pm10",
+    "pm2_5": "pm2_5",
+    "co": "carbon_monoxide",
+    "no2": "nitrogen_dioxide",
+    "so2": "sulphur_dioxide",
+    "o3": "ozone"
+}
+
+def _parse_iso(value):
+    return datetime.datetime.fromisoformat(value) if value else None
 
 def parse_weather_data(weather_data, air_pollution_data):
+    with metrics.span("parse_weather_data"):
+        return _parse_weather_data(weather_data, air_pollution_data)
+
+def _parse_weather_data(weather_data, air_pollution_data):
     if not weather_data:
         return None
 
-    current_time_dt = datetime.datetime.fromisoformat(weather_data['current']['time'])
-    
-    hourly_times = [datetime.datetime.fromisoformat(t) for t in weather_data['hourly']['time']]
-    current_hourly_index = min(range(len(hourly_times)), key=lambda i: abs(hourly_times[i] - current_time_dt))
+    current = weather_data['current']
+    current_time = current['time']
+
+    hourly = TimeSeries(weather_data['hourly'])
+    current_hourly_index = hourly.nearest_index(current_time)
+
+    daily = weather_data['daily']
+    sunrise = daily.get('sunrise') or []
+    sunset = daily.get('sunset') or []
 
-    current_hourly_data = {k: v[current_hourly_index] for k, v in weather_data['hourly'].items() if k in ['temperature_2m', 'uv_index', 'precipitation_probability', 'rain', 'weather_code']}
-    
     parsed_current = {
-        "temp": weather_data['current'].get('temperature_2m'),
-        "feels_like": weather_data['current'].get('apparent_temperature'),
-        "humidity": weather_data['current'].get('relative_humidity_2m'),
-        "description": get_weather_description(weather_data['current'].get('weather_code')),
-        "weather_code": weather_data['current'].get('weather_code'),
-        "uvi": current_hourly_data.get('uv_index'),
-        "sunrise": datetime.datetime.fromisoformat(weather_data['daily']['sunrise'][0]) if weather_data['daily']['sunrise'] else None,
-        "sunset": datetime.datetime.fromisoformat(weather_data['daily']['sunset'][0]) if weather_data['daily']['sunset'] else None,
-        "rain_rate": weather_data['current'].get('precipitation'),
-        "wind_speed": weather_data['current'].get('wind_speed_10m')
+        "temp": current.get('temperature_2m'),
+        "feels_like": current.get('apparent_temperature'),
+        "humidity": current.get('relative_humidity_2m'),
+        "description": get_weather_description(current.get('weather_code')),
+        "weather_code": current.get('weather_code'),
+        "is_day": current.get('is_day'),
+        "severity": get_severity(current.get('weather_code')),
+        "uvi": hourly.value_at('uv_index', current_hourly_index),
+        "sunrise": _parse_iso(sunrise[0]) if sunrise else None,
+        "sunset": _parse_iso(sunset[0]) if sunset else None,
+        "rain_rate": current.get('precipitation'),
+        "wind_speed": current.get('wind_speed_10m')
     }
-    
-    parsed_daily = []
-    for i in range(len(weather_data['daily']['time'])):
-        day_data = {k: v[i] for k, v in weather_data['daily'].items()}
-        parsed_daily.append({
-            "dt": datetime.datetime.fromisoformat(day_data['time']),
-            "temp_max": day_data['temperature_2m_max'],
-            "temp_min": day_data['temperature_2m_min'],
-            "description": get_weather_description(day_data['weather_code']),
-            "weather_code": day_data['weather_code'],
-            "pop": day_data['precipitation_probability_max']
-        })
-    
+
+    parsed_daily = [
+        {
+            "dt": datetime.datetime.fromisoformat(day_time),
+            "temp_max": temp_max,
+            "temp_min": temp_min,
+            "description": get_weather_description(weather_code),
+            "weather_code": weather_code,
+            "severity": get_severity(weather_code),
+            "pop": pop
+        }
+        for day_time, temp_max, temp_min, weather_code, pop in zip(
+            daily['time'],
+            daily['temperature_2m_max'],
+            daily['temperature_2m_min'],
+            daily['weather_code'],
+            daily['precipitation_probability_max']
+        )
+    ]
+
     parsed_air_quality = None
+    air_quality_hourly = None
+    parsed_aqi = None
     if air_pollution_data and air_pollution_data.get('hourly'):
-        aq_hourly_times = [datetime.datetime.fromisoformat(t) for t in air_pollution_data['hourly']['time']]
-        current_aq_index = min(range(len(aq_hourly_times)), key=lambda i: abs(aq_hourly_times[i] - current_time_dt))
-
-        aq_components = {
-            "pm10": air_pollution_data['hourly'].get('pm10', [None])[current_aq_index],
-            "pm2_5": air_pollution_data['hourly'].get('pm2_5', [None])[current_aq_index],
-            "co": air_pollution_data['hourly'].get('carbon_monoxide', [None])[current_aq_index],
-            "no2": air_pollution_data['hourly'].get('nitrogen_dioxide', [None])[current_aq_index],
-            "so2": air_pollution_data['hourly'].get('sulphur_dioxide', [None])[current_aq_index],
-            "o3": air_pollution_data['hourly'].get('ozone', [None])[current_aq_index]
+        air_quality_hourly = TimeSeries(air_pollution_data['hourly'])
+        current_aq_index = air_quality_hourly.nearest_index(current_time)
+        parsed_air_quality = {
+            key: air_quality_hourly.value_at(field, current_aq_index)
+            for key, field in AIR_QUALITY_FIELDS.items()
         }
-        parsed_air_quality = {k: v for k, v in aq_components.items() if v is not None}
+        parsed_air_quality = {k: v for k, v in parsed_air_quality.items() if v is not None}
         if not parsed_air_quality:
             parsed_air_quality = None
-            
+        with metrics.span("compute_aqi"):
+            parsed_aqi = compute_aqi(air_quality_hourly, current_aq_index, daily['time'])
+
     return {
         "current": parsed_current,
         "daily": parsed_daily,
-        "air_quality": parsed_air_quality
-    }
\ No newline at end of file
+        "air_quality": parsed_air_quality,
+        "aqi": parsed_aqi,
+        "hourly": hourly,
+        "hourly_index": current_hourly_index,
+        "air_quality_hourly": air_quality_hourly
+    }
+
+def convert_temperature(value, temperature_unit):
+    if value is None or temperature_unit == CANONICAL_TEMPERATURE_UNIT:
+        return value
+    if temperature_unit == "fahrenheit":
+        return value * 9 / 5 + 32
+    raise ValueError(f"Unsupported temperature unit: {temperature_unit}")
+
+def convert_parsed_data(parsed_data, temperature_unit):
+    if not parsed_data or temperature_unit == CANONICAL_TEMPERATURE_UNIT:
+        return parsed_data
+    current = dict(parsed_data['current'])
+    for key in ("temp", "feels_like"):
+        current[key] = convert_temperature(current.get(key), temperature_unit)
+    daily = []
+    for day in parsed_data['daily']:
+        day = dict(day)
+        day['temp_max'] = convert_temperature(day.get('temp_max'), temperature_unit)
+        day['temp_min'] = convert_temperature(day.get('temp_min'), temperature_unit)
+        daily.append(day)
+    return dict(parsed_data, current=current, daily=daily)
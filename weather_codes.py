@@ -0,0 +1,81 @@
+SEVERITY_NONE = 0
+SEVERITY_LOW = 1
+SEVERITY_MODERATE = 2
+SEVERITY_HIGH = 3
+SEVERITY_SEVERE = 4
+SEVERITY_NAMES = ("none", "low", "moderate", "high", "severe")
+
+UNKNOWN_DESCRIPTION = "Unknown weather"
+DEFAULT_ICON_KEY = "default"
+NIGHT_SUFFIX = "-night"
+
+# WMO weather interpretation codes as reported by Open-Meteo:
+# code: (description, day icon key, severity, has a night variant)
+WEATHER_CODES = {
+    0: ("Clear sky", "0", SEVERITY_NONE, True),
+    1: ("Mainly clear", "1", SEVERITY_NONE, True),
+    2: ("Partly cloudy", "2", SEVERITY_NONE, True),
+    3: ("Overcast", "3", SEVERITY_NONE, False),
+    45: ("Fog", "45", SEVERITY_LOW, False),
+    48: ("Depositing rime fog", "45", SEVERITY_MODERATE, False),
+    51: ("Drizzle: Light", "51", SEVERITY_LOW, False),
+    53: ("Drizzle: Moderate", "51", SEVERITY_LOW, False),
+    55: ("Drizzle: Dense intensity", "51", SEVERITY_MODERATE, False),
+    56: ("Freezing Drizzle: Light", "51", SEVERITY_MODERATE, False),
+    57: ("Freezing Drizzle: Dense intensity", "51", SEVERITY_HIGH, False),
+    61: ("Rain: Slight", "61", SEVERITY_LOW, False),
+    63: ("Rain: Moderate", "61", SEVERITY_MODERATE, False),
+    65: ("Rain: Heavy intensity", "61", SEVERITY_HIGH, False),
+    66: ("Freezing Rain: Light", "61", SEVERITY_HIGH, False),
+    67: ("Freezing Rain: Heavy intensity", "61", SEVERITY_SEVERE, False),
+    71: ("Snow fall: Slight", "71", SEVERITY_LOW, False),
+    73: ("Snow fall: Moderate", "71", SEVERITY_MODERATE, False),
+    75: ("Snow fall: Heavy intensity", "71", SEVERITY_HIGH, False),
+    77: ("Snow grains", "71", SEVERITY_LOW, False),
+    80: ("Rain showers: Slight", "80", SEVERITY_LOW, False),
+    81: ("Rain showers: Moderate", "80", SEVERITY_MODERATE, False),
+    82: ("Rain showers: Violent", "80", SEVERITY_HIGH, False),
+    85: ("Snow showers: Slight", "71", SEVERITY_MODERATE, False),
+    86: ("Snow showers: Heavy", "71", SEVERITY_HIGH, False),
+    95: ("Thunderstorm: Slight or moderate", "95", SEVERITY_HIGH, False),
+    96: ("Thunderstorm with slight hail", "95", SEVERITY_SEVERE, False),
+    99: ("Thunderstorm with heavy hail", "95", SEVERITY_SEVERE, False)
+}
+
+# Dense tables indexed by code, built once. The extra final slot holds the
+# unknown entry so out-of-range codes index it instead of branching.
+MAX_CODE = max(WEATHER_CODES)
+UNKNOWN_INDEX = MAX_CODE + 1
+DESCRIPTIONS = [UNKNOWN_DESCRIPTION] * (UNKNOWN_INDEX + 1)
+DAY_ICON_KEYS = [DEFAULT_ICON_KEY] * (UNKNOWN_INDEX + 1)
+NIGHT_ICON_KEYS = [DEFAULT_ICON_KEY] * (UNKNOWN_INDEX + 1)
+SEVERITIES = [SEVERITY_NONE] * (UNKNOWN_INDEX + 1)
+for _code, (_description, _icon_key, _severity, _has_night) in WEATHER_CODES.items():
+    DESCRIPTIONS[_code] = _description
+    DAY_ICON_KEYS[_code] = _icon_key
+    NIGHT_ICON_KEYS[_code] = _icon_key + NIGHT_SUFFIX if _has_night else _icon_key
+    SEVERITIES[_code] = _severity
+DESCRIPTIONS = tuple(DESCRIPTIONS)
+DAY_ICON_KEYS = tuple(DAY_ICON_KEYS)
+NIGHT_ICON_KEYS = tuple(NIGHT_ICON_KEYS)
+SEVERITIES = tuple(SEVERITIES)
+del _code, _description, _icon_key, _severity, _has_night
+
+def code_index(weather_code):
+    # Hourly series hold codes as floats, and missing values as None or NaN.
+    try:
+        index = int(weather_code)
+    except (TypeError, ValueError):
+        return UNKNOWN_INDEX
+    return index if 0 <= index <= MAX_CODE else UNKNOWN_INDEX
+
+def get_weather_description(weather_code):
+    return DESCRIPTIONS[code_index(weather_code)]
+
+def get_icon_key(weather_code, is_day=True):
+    index = code_index(weather_code)
+    # Open-Meteo sends is_day as 1/0; a missing flag is treated as daytime.
+    return NIGHT_ICON_KEYS[index] if is_day == 0 else DAY_ICON_KEYS[index]
+
+def get_severity(weather_code):
+    return SEVERITIES[code_index(weather_code)]